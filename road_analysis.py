@@ -0,0 +1,63 @@
+"""
+Derived measurements of a cross-section: centreline elevation, edges of
+pavement, median and side-slope points. The drawing code labels these,
+and the section cache keeps them so revisiting a section is free.
+"""
+
+SIMPLE = "simple"    # one ASPHALT layer across the centreline
+DIVIDED = "divided"  # ASPHALT_L and ASPHALT_R either side of a median
+
+
+class SectionAnalysis:
+    """
+    What the labels need to know about a section.
+
+    carriageways holds one (first E.P., second E.P.) pair of
+    (offset, elevation) points per carriageway, in the order the
+    asphalt layer lists them: left then right for a simple road, inner
+    then outer for each side of a divided one. slopes holds
+    (road edge, catch point) pairs for the left and right side slopes.
+    """
+    __slots__ = ("layout", "centerline_elevation", "carriageways", "median_point", "slopes")
+
+    def __init__(self):
+        self.layout = None
+        self.centerline_elevation = None
+        self.carriageways = []
+        self.median_point = None
+        self.slopes = []
+
+
+def analyze_section(section):
+    """Works out the labelled points of a Section."""
+    analysis = SectionAnalysis()
+    asphalt = section.find_layer("ASPHALT")
+    asphalt_l = section.find_layer("ASPHALT_L")
+    asphalt_r = section.find_layer("ASPHALT_R")
+    subbase = section.find_layer("SUBBASE")
+    median = section.find_layer("MEDIAN")
+    terrain = section.find_layer("TERRAIN")
+
+    # Case 1: Simple Road (like sample.road)
+    if asphalt:
+        analysis.layout = SIMPLE
+        analysis.centerline_elevation = asphalt.profile().y_at(0)
+        analysis.carriageways.append((asphalt.point(0), asphalt.point(1)))
+
+    # Case 2: Divided Highway (like complex_road.road)
+    elif asphalt_l and asphalt_r:
+        analysis.layout = DIVIDED
+        analysis.carriageways.append((asphalt_l.point(0), asphalt_l.point(1)))
+        analysis.carriageways.append((asphalt_r.point(0), asphalt_r.point(1)))
+
+    if median:
+        # Get median center (approx)
+        analysis.median_point = median.point(0)
+
+    if subbase and terrain:
+        # Assumes first/last points of subbase are toes
+        # and points next-to-first/last are road edges
+        analysis.slopes.append((subbase.point(1), subbase.point(0)))
+        analysis.slopes.append((subbase.point(-2), subbase.point(-1)))
+
+    return analysis
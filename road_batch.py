@@ -0,0 +1,283 @@
+"""
+Headless batch renderer: turns whole directories (or globs) of .road
+files into drawings without opening a Tk window.
+
+    python road_batch.py sections/ -o drawings/
+    python road_batch.py "corridor/*.road" -o drawings/ --jobs 8
+    python road_batch.py corridor.roads -o drawings/
+    python road_batch.py sections/ -o drawings/ --timing timings.jsonl
+    python road_batch.py corridor.roads -o sheets/ --sheet 2x3
+    python road_batch.py sections/ -o pngs/ --format png
+    python road_batch.py corridor.roads -o plots/ --format pdf --sheet 3x4
+    python road_batch.py sections/ -o eps/ --format eps
+
+Every section of a .roads container is rendered to its own file, or
+with --sheet, COLUMNSxROWS sections to a page. Drawings are streamed
+into the SVG as they are made. PNGs come from the pure-Python
+rasteriser in road_raster.py, without their labels' text. PDF output is
+one multi-page document of sheets (2x3 unless --sheet says otherwise),
+streamed page by page by road_pdf.py; a section that fails is reported
+and its cell left empty. EPS files come from Tk's own
+canvas.postscript(), so they need a display; they are drawn one after
+another on a single hidden Tk root in this process.
+"""
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import road_timing
+from road_container import RoadContainer, collect_road_files, load_section, section_label
+from road_display import DisplayList
+from road_drawing import CANVAS_WIDTH, CANVAS_HEIGHT, draw_road_section
+from road_pdf import PdfDocument
+from road_raster import PngCanvas
+from road_svg import SvgCanvas
+from road_timing import stage
+
+SVG = "svg"
+PNG = "png"
+PDF = "pdf"
+EPS = "eps"
+FORMATS = (SVG, PNG, PDF, EPS)
+
+SHEET_SCALE = 0.5   # sections on a sheet are drawn at half size
+SHEET_GAP = 10
+PDF_SHEET = (2, 3)
+PDF_FOOTER = 24     # room under the grid for the sheet number
+
+def expand_sections(files):
+    """Turns files into (filepath, entry) jobs; entry is None for a plain .road file."""
+    sections = []
+    for filepath in files:
+        if filepath.endswith(".roads"):
+            with RoadContainer(filepath) as container:
+                sections.extend((filepath, i) for i in range(len(container)))
+        else:
+            sections.append((filepath, None))
+    return sections
+
+def output_name(filepath, entry, extension):
+    name = os.path.splitext(os.path.basename(filepath))[0]
+    if entry is not None:
+        name += f"_{entry:05d}"
+    return name + extension
+
+def render_file(filepath, out_dir, entry=None, fmt=SVG):
+    """Renders one section to an SVG or PNG in out_dir and returns the output path."""
+    record = road_timing.start(section_label(filepath, entry), kind="render")
+    try:
+        section = load_section(filepath, entry)
+        out_path = os.path.join(out_dir, output_name(filepath, entry, "." + fmt))
+        if fmt == PNG:
+            canvas = PngCanvas(CANVAS_WIDTH, CANVAS_HEIGHT)
+            draw_road_section(canvas, section)
+            with stage("write"):
+                canvas.write(out_path)
+        else:
+            with SvgCanvas.open(out_path, CANVAS_WIDTH, CANVAS_HEIGHT) as canvas:
+                draw_road_section(canvas, section)
+        return out_path
+    finally:
+        road_timing.finish(record)
+
+def _draw_cell(canvas, filepath, entry, x, y, scale, kind):
+    """
+    Draws one section, framed, into the sheet cell at (x, y). It is
+    recorded first, so a section that fails to draw leaves nothing behind.
+    """
+    record = road_timing.start(section_label(filepath, entry), kind=kind)
+    try:
+        display = DisplayList()
+        draw_road_section(display, load_section(filepath, entry))
+        canvas.begin_group(x, y, scale, clip=(CANVAS_WIDTH, CANVAS_HEIGHT))
+        canvas.create_polygon(0, 0, CANVAS_WIDTH, 0, CANVAS_WIDTH, CANVAS_HEIGHT, 0, CANVAS_HEIGHT,
+                              fill="ivory", outline="gray50", width=2)
+        display.replay(canvas)
+        canvas.end_group()
+    finally:
+        road_timing.finish(record)
+
+def render_sheet(sections, out_path, columns, rows):
+    """
+    Renders up to columns x rows (filepath, entry) sections onto one SVG
+    page, left to right and top to bottom, one section in memory at a time.
+    """
+    cell_w, cell_h = CANVAS_WIDTH * SHEET_SCALE, CANVAS_HEIGHT * SHEET_SCALE
+    width = columns * (cell_w + SHEET_GAP) + SHEET_GAP
+    height = rows * (cell_h + SHEET_GAP) + SHEET_GAP
+    with SvgCanvas.open(out_path, width, height, bg="white") as canvas:
+        for i, (filepath, entry) in enumerate(sections):
+            row, column = divmod(i, columns)
+            _draw_cell(canvas, filepath, entry, SHEET_GAP + column * (cell_w + SHEET_GAP),
+                       SHEET_GAP + row * (cell_h + SHEET_GAP), SHEET_SCALE, "sheet")
+    return out_path
+
+def render_pdf(sections, out_path, columns, rows, failed=None):
+    """
+    Renders (filepath, entry) sections into one PDF, columns x rows to a
+    page. Pages go to disk as they are finished, so memory stays flat
+    however long the corridor. A section that fails leaves its cell empty
+    and is appended to failed as (file, error).
+    """
+    with PdfDocument(out_path) as document:
+        cell_w = (document.width - SHEET_GAP) / columns - SHEET_GAP
+        cell_h = (document.height - PDF_FOOTER - SHEET_GAP) / rows - SHEET_GAP
+        scale = min(cell_w / CANVAS_WIDTH, cell_h / CANVAS_HEIGHT)
+        # Centre the grid on the page
+        left = (document.width - columns * (CANVAS_WIDTH * scale + SHEET_GAP) + SHEET_GAP) / 2
+        top = (document.height - PDF_FOOTER - rows * (CANVAS_HEIGHT * scale + SHEET_GAP) + SHEET_GAP) / 2
+
+        per_page = columns * rows
+        pages = (len(sections) + per_page - 1) // per_page
+        for number, start in enumerate(range(0, len(sections), per_page), 1):
+            page = document.new_page()
+            for i, (filepath, entry) in enumerate(sections[start:start + per_page]):
+                row, column = divmod(i, columns)
+                try:
+                    _draw_cell(page, filepath, entry, left + column * (CANVAS_WIDTH * scale + SHEET_GAP),
+                               top + row * (CANVAS_HEIGHT * scale + SHEET_GAP), scale, "sheet")
+                except Exception as e:
+                    if failed is None:
+                        raise
+                    failed.append((section_label(filepath, entry), str(e)))
+            page.create_text(document.width / 2, document.height - PDF_FOOTER / 2,
+                             text=f"Sheet {number} of {pages}", font=("Arial", 9))
+            with stage("write"):
+                page.finish()
+    return out_path
+
+def render_eps(sections, out_dir):
+    """
+    Exports (filepath, entry) sections to EPS files in out_dir through
+    one hidden Tk canvas, yielding (file, output, error) as they go.
+    """
+    try:
+        # Imported here, so only EPS output needs tkinter
+        from road_eps import EpsExporter
+        exporter = EpsExporter()
+    except Exception as e:  # e.g. no tkinter, or no display to open Tk on
+        for filepath, entry in sections:
+            yield filepath, None, f"cannot start Tk: {e}"
+        return
+    with exporter:
+        for filepath, entry in sections:
+            record = road_timing.start(section_label(filepath, entry), kind="render")
+            try:
+                section = load_section(filepath, entry)
+                out_path = os.path.join(out_dir, output_name(filepath, entry, ".eps"))
+                result = filepath, exporter.export(section, out_path), None
+            except Exception as e:
+                result = filepath, None, str(e)
+            finally:
+                road_timing.finish(record)
+            yield result
+
+def _render_job(job):
+    filepath, entry, out_dir, fmt = job
+    try:
+        return filepath, render_file(filepath, out_dir, entry, fmt), None
+    except Exception as e:
+        return filepath, None, str(e)
+
+def _sheet_job(job):
+    sections, out_path, columns, rows = job
+    try:
+        return out_path, render_sheet(sections, out_path, columns, rows), None
+    except Exception as e:
+        return out_path, None, str(e)
+
+def render_files(files, out_dir, jobs=None, sheet=None, fmt=SVG):
+    """
+    Renders every section over a process pool, yielding (file, output,
+    error). With sheet=(columns, rows) each job is an SVG page of sections.
+    PDF output is a single document and EPS needs Tk, so both are
+    written in this process; the sections missing from a PDF come before
+    the document itself, each with its error.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    sections = expand_sections(files)
+    if fmt == PDF:
+        name = os.path.splitext(os.path.basename(files[0]))[0] if len(files) == 1 else "sheets"
+        out_path = os.path.join(out_dir, name + ".pdf")
+        failed = []
+        try:
+            result = out_path, render_pdf(sections, out_path, *(sheet or PDF_SHEET), failed), None
+        except Exception as e:
+            result = out_path, None, str(e)
+        for label, error in failed:
+            yield label, None, error
+        yield result
+        return
+    if fmt == EPS:
+        yield from render_eps(sections, out_dir)
+        return
+    if sheet is None:
+        job_function = _render_job
+        work = [(filepath, entry, out_dir, fmt) for filepath, entry in sections]
+    else:
+        columns, rows = sheet
+        per_page = columns * rows
+        job_function = _sheet_job
+        work = [(sections[start:start + per_page],
+                 os.path.join(out_dir, f"sheet_{start // per_page + 1:04d}.svg"), columns, rows)
+                for start in range(0, len(sections), per_page)]
+    if jobs == 1:
+        yield from map(job_function, work)
+        return
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        # Chunking keeps the per-task overhead low for thousands of tiny files
+        chunksize = max(1, len(work) // ((jobs or os.cpu_count() or 1) * 8))
+        yield from pool.map(job_function, work, chunksize=chunksize)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render .road files without a GUI.")
+    parser.add_argument("paths", nargs="+", help=".road files, directories or glob patterns")
+    parser.add_argument("-o", "--out-dir", default="renders", help="output directory")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="worker processes (default: one per core)")
+    parser.add_argument("--timing", nargs="?", const="1", default=None, metavar="LOG",
+                        help="log per-stage timings as JSON lines (to LOG, or stderr)")
+    parser.add_argument("--sheet", default=None, metavar="COLSxROWS",
+                        help="put several sections on each page, e.g. 2x3")
+    parser.add_argument("--format", choices=FORMATS, default=SVG, help="output file format")
+    args = parser.parse_args(argv)
+
+    sheet = None
+    if args.sheet:
+        try:
+            sheet = tuple(int(n) for n in args.sheet.lower().split("x"))
+        except ValueError:
+            sheet = ()
+        if len(sheet) != 2 or min(sheet) < 1:
+            parser.error(f"--sheet must look like 2x3, not {args.sheet!r}")
+        if args.format in (PNG, EPS):
+            parser.error("--sheet pages are SVG or PDF only")
+
+    if args.timing:
+        # Through the environment, so worker processes pick it up too
+        os.environ[road_timing.ENV_VAR] = args.timing
+        road_timing.configure()
+
+    files = collect_road_files(args.paths)
+    if not files:
+        print("No .road files found.", file=sys.stderr)
+        return 1
+
+    rendered = failures = 0
+    for filepath, out_path, error in render_files(files, args.out_dir, args.jobs, sheet, args.format):
+        if error:
+            failures += 1
+            print(f"[FAILED] {filepath}: {error}", file=sys.stderr)
+        else:
+            rendered += 1
+    if args.format == PDF:
+        # The failures there are sections left out of the document
+        print(f"Rendered {rendered} documents to {args.out_dir} with {failures} failures")
+    else:
+        what = "sheets" if sheet else "sections"
+        print(f"Rendered {rendered} of {rendered + failures} {what} to {args.out_dir}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
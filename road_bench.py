@@ -0,0 +1,241 @@
+"""
+Benchmarks for parsing, lookups, areas and rendering on synthetic data
+(see road_synth.py), at sizes well beyond the sample files.
+
+Each benchmark is timed as the best of --repeat runs and then run once
+more under tracemalloc for its peak memory. Results can be saved as
+JSON and compared with a saved baseline; a benchmark that got slower
+(or hungrier) than the tolerance allows makes the run fail.
+
+    python road_bench.py
+    python road_bench.py --sizes 1000,100000 --only parse,lookup --json now.json
+    python road_bench.py --compare baseline.json --tolerance 0.25
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from road_analysis import DIVIDED
+from road_container import RoadContainer
+from road_display import DisplayList
+from road_drawing import CANVAS_HEIGHT, CANVAS_WIDTH, DEFAULT_VIEW, draw_road_section, find_y_at_x
+from road_earthwork import section_areas
+from road_geometry import LevelOfDetail, PreparedPolyline, polygon_area, sample_offsets
+from road_parser import collect_section, format_road_section, iter_road_records
+from road_raster import PngCanvas
+from road_svg import SvgCanvas
+from road_synth import synth_corridor, synth_section, write_corridor
+from road_template import SideSlopes, catch_point
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+DEFAULT_SECTIONS = 500
+LOOKUPS = 2000
+SCAN_LOOKUPS = 200  # find_y_at_x is O(n) per call, so fewer
+
+
+class Result:
+    """Timing and memory of one benchmark at one size."""
+    __slots__ = ("name", "size", "seconds", "units", "unit", "peak_bytes")
+
+    def __init__(self, name, size, seconds, units, unit, peak_bytes):
+        self.name = name
+        self.size = size
+        self.seconds = seconds
+        self.units = units
+        self.unit = unit
+        self.peak_bytes = peak_bytes
+
+    @property
+    def key(self):
+        return f"{self.name}@{self.size}"
+
+    def rate(self):
+        return self.units / self.seconds if self.seconds > 0 else float("inf")
+
+    def as_dict(self):
+        return {"name": self.name, "size": self.size, "seconds": self.seconds,
+                "units": self.units, "unit": self.unit, "peak_bytes": self.peak_bytes}
+
+
+# --- Benchmarks ---
+# Each takes a size (terrain points, or sections for corridor benchmarks)
+# and a scratch directory, does its setup, and returns (run, units, unit name).
+
+def bench_parse(size, scratch):
+    lines = format_road_section(synth_section(terrain_points=size, layout=DIVIDED)).splitlines()
+    vertices = sum(line.count(",") - 1 for line in lines if not line.startswith("#")) // 2
+    return lambda: collect_section(iter_road_records(lines)), vertices, "vertices"
+
+def bench_lookup_scan(size, scratch):
+    terrain = synth_section(terrain_points=size).find_layer("TERRAIN")
+    offsets = sample_offsets(-59.0, 59.0, 118.0 / (SCAN_LOOKUPS - 1))
+    return lambda: [find_y_at_x(terrain.data, x) for x in offsets], len(offsets), "lookups"
+
+def bench_lookup_prepared(size, scratch):
+    terrain = synth_section(terrain_points=size).find_layer("TERRAIN")
+    offsets = sample_offsets(-59.0, 59.0, 118.0 / (LOOKUPS - 1))
+    # Building the index is part of the cost
+    return lambda: PreparedPolyline(terrain.data).y_at_many(offsets), len(offsets), "lookups"
+
+def bench_area(size, scratch):
+    section = synth_section(terrain_points=size)
+    vertices = sum(len(layer) for layer in section.layers)
+    return lambda: [polygon_area(layer.data) for layer in section.layers], vertices, "vertices"
+
+def bench_cut_fill(size, scratch):
+    section = synth_section(terrain_points=size)
+    def run():
+        for layer in section.layers:
+            layer._profile = None  # measure the profile build too, not a cached one
+        return section_areas(section)
+    return run, sum(len(layer) for layer in section.layers), "vertices"
+
+def bench_lod(size, scratch):
+    terrain = synth_section(terrain_points=size).find_layer("TERRAIN")
+    return lambda: LevelOfDetail(terrain.data).simplified(DEFAULT_VIEW.tolerance()), size, "vertices"
+
+def bench_catch_points(size, scratch):
+    terrain = synth_section(terrain_points=size).find_layer("TERRAIN")
+    ground = terrain.profile().surface()
+    slopes = SideSlopes()
+    edges = [(x, -4.0 + k * 0.01) for k in range(LOOKUPS // 4) for x in (-13.0, 13.0)]
+    def run():
+        return [catch_point(ground, edge, 1 if edge[0] > 0 else -1, slopes) for edge in edges]
+    return run, len(edges), "points"
+
+def bench_render(size, scratch):
+    section = synth_section(terrain_points=size, layout=DIVIDED)
+    out_path = os.path.join(scratch, "render.svg")
+    def run():
+        for layer in section.layers:
+            layer._lod = None
+        with SvgCanvas.open(out_path, CANVAS_WIDTH, CANVAS_HEIGHT) as canvas:
+            draw_road_section(canvas, section)
+    return run, 1, "sections"
+
+def bench_raster(size, scratch):
+    section = synth_section(terrain_points=size, layout=DIVIDED)
+    out_path = os.path.join(scratch, "render.png")
+    def run():
+        for layer in section.layers:
+            layer._lod = None
+        canvas = PngCanvas(CANVAS_WIDTH, CANVAS_HEIGHT)
+        draw_road_section(canvas, section)
+        canvas.write(out_path)
+    return run, 1, "sections"
+
+def bench_record(size, scratch):
+    section = synth_section(terrain_points=size, layout=DIVIDED)
+    def run():
+        for layer in section.layers:
+            layer._lod = None
+        draw_road_section(DisplayList(), section)
+    return run, 1, "sections"
+
+def bench_corridor_read(size, scratch):
+    path = os.path.join(scratch, f"corridor_{size}.roads")
+    if not os.path.exists(path):
+        write_corridor(path, synth_corridor(size))
+    def run():
+        with RoadContainer(path) as container:
+            for i in range(len(container)):
+                container.read_entry(i)
+    return run, size, "sections"
+
+BENCHMARKS = {
+    "parse": bench_parse,
+    "lookup-scan": bench_lookup_scan,
+    "lookup": bench_lookup_prepared,
+    "area": bench_area,
+    "cut-fill": bench_cut_fill,
+    "lod": bench_lod,
+    "catch": bench_catch_points,
+    "render": bench_render,
+    "raster": bench_raster,
+    "record": bench_record,
+    "corridor": bench_corridor_read,
+}
+CORRIDOR_BENCHMARKS = {"corridor"}
+
+def run_benchmark(name, size, scratch, repeat=3):
+    """Runs one benchmark and returns its Result."""
+    run, units, unit = BENCHMARKS[name](size, scratch)
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - t0)
+
+    tracemalloc.start()
+    try:
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return Result(name, size, best, units, unit, peak)
+
+def compare(results, baseline, tolerance):
+    """Returns a line per result that is slower or bigger than baseline allows."""
+    previous = {f"{r['name']}@{r['size']}": r for r in baseline}
+    regressions = []
+    for result in results:
+        old = previous.get(result.key)
+        if old is None:
+            continue
+        if result.seconds > old["seconds"] * (1 + tolerance):
+            regressions.append(f"{result.key}: {old['seconds'] * 1000:.2f} ms -> {result.seconds * 1000:.2f} ms")
+        if result.peak_bytes > old["peak_bytes"] * (1 + tolerance):
+            regressions.append(f"{result.key}: peak {old['peak_bytes']:,} -> {result.peak_bytes:,} bytes")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the road tools on synthetic sections.")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="comma-separated terrain point counts")
+    parser.add_argument("--sections", type=int, default=DEFAULT_SECTIONS,
+                        help="sections in the corridor benchmarks")
+    parser.add_argument("--only", default="", help="comma-separated benchmark names: " + ", ".join(BENCHMARKS))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", default=None, help="write the results to this file")
+    parser.add_argument("--compare", default=None, help="baseline JSON from an earlier --json run")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed slowdown or memory growth against the baseline (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    names = [n for n in args.only.split(",") if n] or list(BENCHMARKS)
+    unknown = [n for n in names if n not in BENCHMARKS]
+    if unknown:
+        print(f"Unknown benchmarks: {', '.join(unknown)}", file=sys.stderr)
+        return 2
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+
+    results = []
+    print(f"{'benchmark':<14}{'size':>9}{'time':>12}{'throughput':>24}{'peak memory':>14}")
+    with tempfile.TemporaryDirectory() as scratch:
+        for name in names:
+            for size in ([args.sections] if name in CORRIDOR_BENCHMARKS else sizes):
+                result = run_benchmark(name, size, scratch, args.repeat)
+                results.append(result)
+                print(f"{name:<14}{size:>9}{result.seconds * 1000:>10.2f}ms"
+                      f"{result.rate():>14,.0f} {result.unit + '/s':<9}"
+                      f"{result.peak_bytes / 1024:>11,.0f} KB")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump([r.as_dict() for r in results], f, indent=1)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"[REGRESSION] {line}", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,191 @@
+"""
+Binary companion cache for .road files.
+
+After a .road file is parsed once, its layers are written next to it as
+'<name>.road.bin'. Later loads memory-map that file and hand out the
+coordinates as memoryviews straight into the mapping, so there is no
+text parsing and no float() call per coordinate.
+
+Layout (little-endian header, native float64 data):
+
+    header       MAGIC, version, byte order, source mtime_ns, source size,
+                 layer count, chainage length, SHA-1 of the source text
+    chainage     UTF-8 bytes
+    layer table  per layer: type length, color length, first coord, coord count,
+                 bounding box, followed by the type and color bytes
+    padding      up to an 8-byte boundary
+    coordinates  every layer's float64 coordinates, back to back
+
+The cache is used when the source's mtime and size match the header, or
+failing that when the source's SHA-1 still matches (e.g. after a touch).
+Otherwise the source is re-parsed and the cache rewritten. The source is
+read once, and those same bytes are hashed and parsed, so the digest in
+the header always belongs to the coordinates stored with it. A cache
+file that is truncated or corrupt is deleted and rebuilt the same way.
+"""
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from road_model import Layer, Section
+from road_parser import parse_road_bytes
+from road_timing import stage
+
+MAGIC = b"ROADBIN\0"
+VERSION = 2
+CACHE_SUFFIX = ".bin"
+HEADER = struct.Struct("<8sHBxqqII20s")
+LAYER_ENTRY = struct.Struct("<HHQI4d")
+BYTE_ORDERS = {"little": 0, "big": 1}
+
+def cache_path_for(filepath):
+    return filepath + CACHE_SUFFIX
+
+def _read_source(filepath):
+    with stage("read") as s:
+        with open(filepath, 'rb') as f:
+            data = f.read()
+        s.add(len(data))
+    return data
+
+def _digest(data):
+    with stage("hash"):
+        return hashlib.sha1(data).digest()
+
+def write_binary_section(cache_path, section, source_stat, digest):
+    """Writes a parsed Section to cache_path (atomically, via a temp file)."""
+    chainage_bytes = section.chainage.encode()
+    table = []
+    coords = array('d')
+    for layer in section.layers:
+        type_bytes, color_bytes = layer.type.encode(), layer.color.encode()
+        bbox = layer.bbox or (0.0, 0.0, 0.0, 0.0)
+        table.append(LAYER_ENTRY.pack(len(type_bytes), len(color_bytes), len(coords), len(layer.data), *bbox))
+        table.append(type_bytes + color_bytes)
+        coords.extend(layer.data)
+
+    head = HEADER.pack(MAGIC, VERSION, BYTE_ORDERS[sys.byteorder], source_stat.st_mtime_ns,
+                       source_stat.st_size, len(section.layers), len(chainage_bytes), digest)
+    body = head + chainage_bytes + b"".join(table)
+    body += b"\0" * (-len(body) % 8)
+
+    tmp_path = cache_path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(body)
+        coords.tofile(f)
+    os.replace(tmp_path, cache_path)
+
+def _refresh_header(cache_path, header, source_stat):
+    """Records a new mtime/size for an unchanged source so the next load skips hashing."""
+    fields = list(header)
+    fields[3], fields[4] = source_stat.st_mtime_ns, source_stat.st_size
+    try:
+        with open(cache_path, 'r+b') as f:
+            f.write(HEADER.pack(*fields))
+    except OSError:
+        pass
+
+def read_binary_header(cache_path):
+    """Returns the unpacked header fields of a cache file, or None if unreadable."""
+    try:
+        with open(cache_path, 'rb') as f:
+            fields = HEADER.unpack(f.read(HEADER.size))
+    except (OSError, struct.error):
+        return None
+    if fields[0] != MAGIC or fields[1] != VERSION or fields[2] != BYTE_ORDERS[sys.byteorder]:
+        return None
+    return fields
+
+def map_binary_section(cache_path):
+    """
+    Memory-maps a cache file and returns its Section. Each layer's data
+    is a read-only float64 memoryview into the mapping. Raises
+    ValueError (or struct.error) if the file is truncated or corrupt.
+    """
+    with open(cache_path, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic, version, byte_order, mtime_ns, size, layer_count, chainage_len, digest = \
+        HEADER.unpack_from(mapped, 0)
+    pos = HEADER.size
+    global_chainage = mapped[pos:pos + chainage_len].decode()
+    pos += chainage_len
+    if pos > len(mapped):
+        raise ValueError(f"{cache_path}: chainage runs past the end of the file")
+
+    table = []
+    for _ in range(layer_count):
+        type_len, color_len, first, count, *bbox = LAYER_ENTRY.unpack_from(mapped, pos)
+        pos += LAYER_ENTRY.size
+        layer_type = mapped[pos:pos + type_len].decode()
+        color = mapped[pos + type_len:pos + type_len + color_len].decode()
+        pos += type_len + color_len
+        table.append((layer_type, color, first, count, tuple(bbox) if count else None))
+
+    pos += -pos % 8
+    if pos > len(mapped) or (len(mapped) - pos) % 8:
+        raise ValueError(f"{cache_path}: coordinate data is truncated")
+    coords = memoryview(mapped)[pos:].cast('d')
+    for layer_type, color, first, count, bbox in table:
+        if count % 2 or first + count > len(coords):
+            raise ValueError(f"{cache_path}: layer {layer_type!r} does not fit the coordinate data")
+    # The stored bounding boxes spare a pass over the coordinates
+    layers = [Layer(layer_type, color, coords[first:first + count], bbox)
+              for layer_type, color, first, count, bbox in table]
+    return Section(global_chainage, layers)
+
+def _timed_map(cache_path):
+    with stage("map") as s:
+        section = map_binary_section(cache_path)
+        s.add(sum(len(layer) for layer in section.layers))
+    return section
+
+def _map_or_discard(cache_path):
+    """The mapped Section, or None after deleting the cache file if it is damaged."""
+    try:
+        return _timed_map(cache_path)
+    except (struct.error, TypeError, ValueError):
+        try:
+            os.remove(cache_path)
+        except OSError:
+            pass
+        return None
+
+def load_cached_section(filepath, cancel=None):
+    """
+    Returns the Section for a .road file, from its binary
+    companion when that is still valid, otherwise by parsing the text
+    and (re)writing the companion.
+    """
+    return load_cached_section_digest(filepath, cancel)[0]
+
+def load_cached_section_digest(filepath, cancel=None):
+    """load_cached_section(), also returning the SHA-1 of the text the Section came from."""
+    # Taken before the read: if the file changes after this, the cache
+    # records the older mtime and the next load checks the content again
+    source_stat = os.stat(filepath)
+    cache_path = cache_path_for(filepath)
+    header = read_binary_header(cache_path)
+    if header is not None and header[3] == source_stat.st_mtime_ns and header[4] == source_stat.st_size:
+        section = _map_or_discard(cache_path)
+        if section is not None:
+            return section, header[7]
+        header = None
+
+    data = _read_source(filepath)
+    digest = _digest(data)
+    if header is not None and header[7] == digest:
+        section = _map_or_discard(cache_path)
+        if section is not None:
+            _refresh_header(cache_path, header, source_stat)
+            return section, digest
+
+    section = parse_road_bytes(data, cancel)
+    try:
+        write_binary_section(cache_path, section, source_stat, digest)
+    except OSError:
+        pass  # Read-only location: just go without a cache
+    return section, digest
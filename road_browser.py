@@ -0,0 +1,50 @@
+"""
+Stepping through a corridor one section at a time.
+
+A Corridor is the station-ordered index of a set of .road/.roads files
+(see road_container.corridor_index) plus a current position. It only
+knows where sections live; loading and drawing stay with the caller.
+"""
+from road_container import corridor_index
+
+PREFETCH_RADIUS = 3
+
+
+class Corridor:
+    """The sections of a corridor in station order, with a cursor."""
+
+    def __init__(self, filepaths):
+        self.index = corridor_index(filepaths)  # (station, filepath, entry)
+        self.position = 0
+
+    def __len__(self):
+        return len(self.index)
+
+    def current(self):
+        """(filepath, entry) of the section under the cursor."""
+        station, filepath, entry = self.index[self.position]
+        return filepath, entry
+
+    def step(self, delta):
+        """Moves the cursor (clamped to the ends) and returns True if it moved."""
+        position = min(max(self.position + delta, 0), len(self.index) - 1)
+        moved = position != self.position
+        self.position = position
+        return moved
+
+    def neighbours(self, radius=PREFETCH_RADIUS, direction=1):
+        """
+        (filepath, entry) of the sections around the cursor, nearest
+        first, favouring the direction of travel at equal distance.
+        """
+        items = []
+        for distance in range(1, radius + 1):
+            for position in (self.position + direction * distance, self.position - direction * distance):
+                if 0 <= position < len(self.index):
+                    station, filepath, entry = self.index[position]
+                    items.append((filepath, entry))
+        return items
+
+    def describe(self):
+        station, filepath, entry = self.index[self.position]
+        return f"Section {self.position + 1} of {len(self.index)} (station {station:.2f} m)"
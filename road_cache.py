@@ -0,0 +1,132 @@
+"""
+In-process LRU cache of parsed and analysed sections.
+
+Entries are keyed by (file path, container entry, SHA-1 of the section
+text). A cheap stat() check against the last seen mtime/size of the
+path serves repeat visits without reading the file at all. When the
+file has changed on disk, the section's bytes are read once, through
+the binary cache or the process's shared container, and that same read
+is both hashed and parsed, so an entry always holds the content of its
+key. An entry with the same content is still reused.
+
+The cache is bounded both by entry count and by the approximate bytes
+of coordinate data held; the least recently used sections are evicted
+first. It is safe to use from the GUI thread and background loaders at
+the same time.
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+from road_analysis import analyze_section
+from road_binary import load_cached_section_digest
+from road_container import open_container, parse_entry
+from road_timing import stage
+
+DEFAULT_MAX_ENTRIES = 128
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+ENTRY_OVERHEAD = 1024  # rough bytes for the objects around the coordinate buffers
+
+
+class CachedSection:
+    """
+    A parsed Section with its analysis, and optionally its pre-rendered
+    display list with the Viewport it was drawn through (see
+    road_display.prerender).
+    """
+    __slots__ = ("section", "analysis", "display", "nbytes")
+
+    def __init__(self, section, analysis=None):
+        self.section = section
+        if analysis is None:
+            with stage("analyze") as s:
+                analysis = analyze_section(section)
+                s.add(len(section.layers))
+        self.analysis = analysis
+        self.display = None  # (Viewport, DisplayList), set as one so threads never see half
+        # Counted once up front, allowing for a display list: its coordinates
+        # are Python floats in lists, about four times the packed size
+        self.nbytes = 5 * section.nbytes() + ENTRY_OVERHEAD * (1 + len(section.layers))
+
+
+class SectionCache:
+    """LRU cache of CachedSections with entry-count and memory bounds."""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()   # (path, entry, digest) -> CachedSection
+        self.seen = {}                 # (path, entry) -> ((mtime_ns, size), digest)
+        self.nbytes = 0
+        self.hits = self.misses = 0
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _hit(self, key, cached):
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+            self.hits += 1
+        with stage("cache hit") as s:
+            s.add(1)
+        return cached
+
+    def get(self, filepath, entry=None, cancel=None):
+        """
+        Returns the CachedSection for a .road file (or entry of a .roads
+        container), loading and analysing it on a miss. cancel is passed
+        on to the parser (see road_container.load_section).
+        """
+        path = os.path.abspath(filepath)
+        st = os.stat(path)
+        # Taken before reading, so a change during the load is seen next time
+        signature = (st.st_mtime_ns, st.st_size)
+        with self.lock:
+            seen = self.seen.get((path, entry))
+            key = (path, entry, seen[1]) if seen and seen[0] == signature else None
+            cached = self.entries.get(key)
+        if cached is not None:
+            return self._hit(key, cached)
+
+        section = None
+        if entry is None:
+            section, digest = load_cached_section_digest(path, cancel)
+            digest = digest.hex()
+        else:
+            with stage("read") as s:
+                data = open_container(path).read_bytes(entry)
+                s.add(len(data))
+            with stage("hash"):
+                digest = hashlib.sha1(data).hexdigest()
+
+        key = (path, entry, digest)
+        with self.lock:
+            self.seen[(path, entry)] = (signature, digest)
+            cached = self.entries.get(key)
+        if cached is not None:
+            return self._hit(key, cached)
+
+        cached = CachedSection(section if section is not None else parse_entry(data, cancel))
+        with self.lock:
+            self.misses += 1
+            self._store(key, cached)
+        return cached
+
+    def _store(self, key, cached):
+        old = self.entries.pop(key, None)
+        if old is not None:
+            self.nbytes -= old.nbytes
+        self.entries[key] = cached
+        self.nbytes += cached.nbytes
+        # Always keep the newest entry, even if it alone is over the byte budget
+        while len(self.entries) > 1 and (len(self.entries) > self.max_entries
+                                         or self.nbytes > self.max_bytes):
+            (path, entry, digest), evicted = self.entries.popitem(last=False)
+            self.nbytes -= evicted.nbytes
+            # Forget the path too, unless it has since moved on to other content
+            seen = self.seen.get((path, entry))
+            if seen is not None and seen[1] == digest:
+                del self.seen[(path, entry)]
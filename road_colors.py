@@ -0,0 +1,55 @@
+"""
+Tk colour names resolved to RGB without a Tk root, for the file writers.
+Only the names likely to appear in .road files and the drawing code are
+listed; anything unknown falls back to black.
+"""
+
+NAMED_COLORS = {
+    "black": (0, 0, 0),
+    "white": (255, 255, 255),
+    "ivory": (255, 255, 240),
+    "red": (255, 0, 0),
+    "darkred": (139, 0, 0),
+    "green": (0, 255, 0),  # X11 green, which is what Tk draws
+    "darkgreen": (0, 100, 0),
+    "forestgreen": (34, 139, 34),
+    "olivedrab": (107, 142, 35),
+    "blue": (0, 0, 255),
+    "darkblue": (0, 0, 139),
+    "navy": (0, 0, 128),
+    "yellow": (255, 255, 0),
+    "orange": (255, 165, 0),
+    "brown": (165, 42, 42),
+    "tan": (210, 180, 140),
+    "sienna": (160, 82, 45),
+    "sandybrown": (244, 164, 96),
+    "khaki": (240, 230, 140),
+    "wheat": (245, 222, 179),
+    "gray": (190, 190, 190),  # X11 gray, not the CSS one
+    "grey": (190, 190, 190),
+    "darkgray": (169, 169, 169),
+    "darkgrey": (169, 169, 169),
+    "lightgray": (211, 211, 211),
+    "lightgrey": (211, 211, 211),
+    "dimgray": (105, 105, 105),
+    "dimgrey": (105, 105, 105),
+    "slategray": (112, 128, 144),
+    "slategrey": (112, 128, 144),
+}
+
+def color_to_rgb(color):
+    """Converts a Tk colour ('sandybrown', 'gray50', '#a0b0c0') to (r, g, b)."""
+    name = color.strip().lower().replace(" ", "")
+    if name.startswith('#') and len(name) == 7:
+        return (int(name[1:3], 16), int(name[3:5], 16), int(name[5:7], 16))
+    if name in NAMED_COLORS:
+        return NAMED_COLORS[name]
+    for prefix in ("gray", "grey"):
+        if name.startswith(prefix) and name[len(prefix):].isdigit():
+            level = round(int(name[len(prefix):]) * 255 / 100)
+            return (level, level, level)
+    return (0, 0, 0)
+
+def color_to_hex(color):
+    """Converts a Tk colour to a '#rrggbb' string."""
+    return "#%02x%02x%02x" % color_to_rgb(color)
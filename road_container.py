@@ -0,0 +1,301 @@
+"""
+Multi-section .roads container: many cross-sections in one file with a
+chainage index, so a corridor is one open() instead of thousands.
+
+The container is still .road text. Each section starts with a
+'# SECTION: n' line followed by its usual '# CHAINAGE:' and layer lines.
+After the last section comes the index, sorted by station:
+
+    # INDEX: 3
+    # ENTRY: 45200.0 1024 5120 45+200.00 (Cut Section)
+    ...
+    # INDEX_AT: 987654
+
+The ENTRY fields are station (m), byte offset, byte length and the
+chainage label. The fixed last line gives the byte offset of the INDEX
+line, so a reader only has to look at the tail of the file to find any
+section.
+
+    python road_container.py pack corridor.roads sections/*.road
+    python road_container.py list corridor.roads
+"""
+import bisect
+import glob
+import math
+import os
+import sys
+import threading
+
+from road_binary import load_cached_section
+from road_parser import (collect_section_timed, format_road_section, iter_road_records,
+                         parse_station, read_chainage, read_road_section)
+from road_timing import stage
+
+FORMAT_VERSION = "1"
+TRAILER_KEY = b"# INDEX_AT:"
+
+# Containers opened by open_container(), per process (a forked worker
+# must not share the parent's file offset): key -> ((mtime_ns, size), container)
+_open_containers = {}
+_open_lock = threading.Lock()
+
+def _section_records(data, cancel=None):
+    return iter_road_records(data.decode().splitlines(), cancel=cancel)
+
+def parse_entry(data, cancel=None):
+    """Parses the raw bytes of one container entry (see RoadContainer.read_bytes)."""
+    return collect_section_timed(_section_records(data, cancel))
+
+
+class RoadContainerWriter:
+    """
+    Appends sections to a new .roads file and writes the index on
+    close(). Leaving a with block on an exception calls abort() instead.
+    """
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self.f = open(filepath, 'wb')
+        self.f.write(f"# ROADS: {FORMAT_VERSION}\n".encode())
+        self.entries = []
+
+    def add_section(self, section):
+        """Appends one parsed Section."""
+        station = parse_station(section.chainage)
+        if station is None:
+            raise ValueError(f"Section has no numeric chainage: {section.chainage!r}")
+
+        offset = self.f.tell()
+        self.f.write(f"# SECTION: {len(self.entries)}\n".encode())
+        self.f.write(format_road_section(section).encode())
+        self.entries.append((station, offset, self.f.tell() - offset, section.chainage))
+
+    def add_file(self, filepath):
+        """Appends the section stored in a single .road file."""
+        self.add_section(read_road_section(filepath))
+
+    def close(self):
+        index_at = self.f.tell()
+        self.f.write(f"# INDEX: {len(self.entries)}\n".encode())
+        for station, offset, length, global_chainage in sorted(self.entries):
+            self.f.write(f"# ENTRY: {station!r} {offset} {length} {global_chainage}\n".encode())
+        self.f.write(TRAILER_KEY + f" {index_at}\n".encode())
+        self.f.close()
+
+    def abort(self):
+        """Closes and deletes the unfinished file, so no truncated container is left behind."""
+        self.f.close()
+        try:
+            os.remove(self.filepath)
+        except OSError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class RoadContainer:
+    """
+    Random access to the sections of a .roads file by chainage.
+    Entries are (station, offset, length, chainage) tuples in station order.
+    """
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self.f = open(filepath, 'rb')
+        self.lock = threading.Lock()
+        self.entries = self._read_index()
+        if self.entries is None:
+            self.entries = self._scan_index()
+        self.stations = [entry[0] for entry in self.entries]
+
+    def _read_index(self):
+        """Loads the index through the trailer line, or returns None if there is none."""
+        size = self.f.seek(0, os.SEEK_END)
+        self.f.seek(max(0, size - 64))
+        tail = self.f.read().rstrip()
+        trailer = tail[tail.rfind(b"\n") + 1:]
+        if not trailer.startswith(TRAILER_KEY):
+            return None
+
+        self.f.seek(int(trailer[len(TRAILER_KEY):]))
+        entries = []
+        for kind, payload in _section_records(self.f.read()):
+            if kind == "meta" and payload[0] == "ENTRY":
+                station, offset, length, global_chainage = payload[1].split(" ", 3)
+                entries.append((float(station), int(offset), int(length), global_chainage))
+        return entries
+
+    def _scan_index(self):
+        """Rebuilds the index by reading the whole file (for hand-made containers)."""
+        entries = []
+        start = None
+        global_chainage = None
+        self.f.seek(0)
+        offset = 0
+        for line in self.f:
+            if line.startswith(b"# SECTION:") or line.startswith(b"# INDEX:"):
+                if start is not None:
+                    entries.append((parse_station(global_chainage), start, offset - start, global_chainage))
+                start = offset if line.startswith(b"# SECTION:") else None
+                global_chainage = None
+            elif line.startswith(b"# CHAINAGE:") and start is not None:
+                global_chainage = line.decode().split(':', 1)[1].strip()
+            offset += len(line)
+        if start is not None:
+            entries.append((parse_station(global_chainage), start, offset - start, global_chainage))
+        return sorted(entry for entry in entries if entry[0] is not None)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        return self.iter_sections()
+
+    def chainages(self):
+        """Returns the chainage labels in station order."""
+        return [entry[3] for entry in self.entries]
+
+    def find(self, chainage, tolerance=1e-6):
+        """Returns the index of the entry at a chainage ('45+200.00' or 45200.0)."""
+        station = parse_station(chainage) if isinstance(chainage, str) else chainage
+        if station is None:
+            raise KeyError(chainage)
+        i = bisect.bisect_left(self.stations, station - tolerance)
+        if i < len(self.stations) and abs(self.stations[i] - station) <= tolerance:
+            return i
+        raise KeyError(chainage)
+
+    def nearest(self, station):
+        """Returns the index of the entry closest to a station in metres."""
+        i = bisect.bisect_left(self.stations, station)
+        candidates = [j for j in (i - 1, i) if 0 <= j < len(self.stations)]
+        return min(candidates, key=lambda j: abs(self.stations[j] - station))
+
+    def read_bytes(self, i):
+        """Returns the raw text of entry i without parsing it."""
+        station, offset, length, global_chainage = self.entries[i]
+        with self.lock:
+            self.f.seek(offset)
+            return self.f.read(length)
+
+    def read_entry(self, i, cancel=None):
+        """Parses entry i and returns its Section."""
+        with stage("read") as s:
+            data = self.read_bytes(i)
+            s.add(len(data))
+        return parse_entry(data, cancel)
+
+    def read_section(self, chainage):
+        """Seeks straight to the section at a chainage and parses it."""
+        return self.read_entry(self.find(chainage))
+
+    def iter_sections(self, start_station=-math.inf, stop_station=math.inf):
+        """Yields Sections in station order, one at a time."""
+        i = bisect.bisect_left(self.stations, start_station)
+        while i < len(self.entries) and self.stations[i] <= stop_station:
+            yield self.read_entry(i)
+            i += 1
+
+    def close(self):
+        self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def open_container(filepath):
+    """
+    A RoadContainer for filepath shared by this process, opened again
+    (index and all) when the file's mtime or size has changed.
+    """
+    st = os.stat(filepath)
+    signature = (st.st_mtime_ns, st.st_size)
+    key = (os.getpid(), filepath)
+    with _open_lock:
+        opened = _open_containers.get(key)
+        if opened is None or opened[0] != signature:
+            # The old one is left to close when its last reader lets go of it
+            opened = _open_containers[key] = (signature, RoadContainer(filepath))
+        return opened[1]
+
+def section_label(filepath, entry=None):
+    """Names a section for logs and timings: 'a.road', or 'corridor.roads[12]' for an entry."""
+    return filepath if entry is None else f"{filepath}[{entry}]"
+
+def load_section(filepath, entry=None, cancel=None):
+    """
+    Loads a .road file (through its binary cache), or entry i of a .roads
+    container. Setting the optional cancel event aborts the parse with
+    LoadCancelled.
+    """
+    if entry is None:
+        return load_cached_section(filepath, cancel)
+    return open_container(filepath).read_entry(entry, cancel)
+
+def collect_road_files(patterns):
+    """Expands directories and glob patterns into a sorted list of .road/.roads files."""
+    files = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            files.extend(glob.glob(os.path.join(pattern, "*.road")))
+            files.extend(glob.glob(os.path.join(pattern, "*.roads")))
+        else:
+            files.extend(glob.glob(pattern))
+    return sorted(set(files))
+
+def corridor_index(filepaths):
+    """
+    Lists every section of a set of .road/.roads files as
+    (station, filepath, entry) in station order, without parsing any
+    layers. entry is None for a plain .road file. Sections whose
+    chainage is not a station are left out.
+    """
+    index = []
+    for filepath in filepaths:
+        if filepath.endswith(".roads"):
+            with RoadContainer(filepath) as container:
+                index.extend((entry[0], filepath, i) for i, entry in enumerate(container.entries))
+        else:
+            station = parse_station(read_chainage(filepath))
+            if station is not None:
+                index.append((station, filepath, None))
+    index.sort(key=lambda item: item[0])
+    return index
+
+def pack_files(out_path, filepaths):
+    """Builds a container from individual .road files and returns the section count."""
+    with RoadContainerWriter(out_path) as writer:
+        for filepath in filepaths:
+            writer.add_file(filepath)
+        return len(writer.entries)
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    try:
+        if len(argv) >= 3 and argv[0] == "pack":
+            count = pack_files(argv[1], argv[2:])
+            print(f"Packed {count} sections into {argv[1]}")
+        elif len(argv) == 2 and argv[0] == "list":
+            with RoadContainer(argv[1]) as container:
+                for station, offset, length, global_chainage in container.entries:
+                    print(f"{station:>12.2f}  {global_chainage}")
+        else:
+            print("Usage: road_container.py pack OUT.roads FILE... | list FILE.roads", file=sys.stderr)
+            return 2
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+"""
+Display lists: a section drawn once into a plain Python recording of
+canvas calls, which can later be replayed onto a real tk.Canvas.
+
+Recording needs no Tk, so it can run on a background thread (e.g. while
+prefetching neighbouring chainages); replaying is then just the Tk
+calls themselves, with every transform and label already worked out.
+"""
+from road_drawing import DEFAULT_VIEW, draw_road_section
+from road_svg import flatten_coords
+
+
+class DisplayList:
+    """Records create_line / create_polygon / create_text calls for later replay."""
+    __slots__ = ("items",)
+
+    def __init__(self):
+        self.items = []  # (method name, coords, options)
+
+    def __len__(self):
+        return len(self.items)
+
+    def _record(self, kind, coords, options):
+        self.items.append((kind, flatten_coords(coords), options))
+
+    def create_line(self, *coords, **options):
+        self._record("create_line", coords, options)
+
+    def create_polygon(self, *coords, **options):
+        self._record("create_polygon", coords, options)
+
+    def create_text(self, *coords, **options):
+        self._record("create_text", coords, options)
+
+    def delete(self, *tags):
+        self.items = []
+
+    def replay(self, canvas):
+        """Draws every recorded item onto canvas, in order."""
+        for kind, coords, options in self.items:
+            getattr(canvas, kind)(*coords, **options)
+
+
+def prerender(cached, view=DEFAULT_VIEW):
+    """
+    Records the drawing of a CachedSection through view into
+    cached.display, unless it already holds one for an equal view.
+    """
+    recorded = cached.display
+    if recorded is None or recorded[0] != view:
+        display = DisplayList()
+        draw_road_section(display, cached.section, cached.analysis, view)
+        # A snapshot, since the GUI's view changes in place as it zooms and pans
+        cached.display = (view.copy(), display)
+    return cached
+
+def display_for(cached, view=DEFAULT_VIEW):
+    """
+    The DisplayList of a CachedSection seen through view: the
+    pre-rendered one if it was recorded through an equal view, otherwise
+    recorded now and kept for next time.
+    """
+    return prerender(cached, view).display[1]
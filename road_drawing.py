@@ -0,0 +1,325 @@
+"""
+Coordinate transforms, analysis helpers and drawing routines for road
+cross-sections. Everything here draws onto a "canvas" object with the
+tk.Canvas create_line / create_polygon / create_text interface, so the
+same code renders into the GUI window or into a headless file writer.
+"""
+import math
+
+from road_analysis import DIVIDED, SIMPLE, analyze_section
+from road_geometry import box_contains, boxes_overlap, clip_polygon
+from road_timing import stage
+
+# --- Constants for our Coordinate System ---
+CANVAS_WIDTH = 800
+CANVAS_HEIGHT = 600
+ORIGIN_X = CANVAS_WIDTH / 2
+ORIGIN_Y = CANVAS_HEIGHT / 2
+SCALE = 20  # Pixels per meter
+
+# --- Level of Detail ---
+LOD_PIXELS = 0.5       # vertices closer than this to the simplified outline are dropped
+LOD_MIN_POINTS = 64    # layers smaller than this are always drawn in full
+
+# --- Culling ---
+CLIP_MARGIN = 10       # pixels beyond the canvas edge polygons are clipped at, so cut edges stay hidden
+LABEL_MARGIN = 100     # labels anchored this far off the canvas may still show, so are kept
+
+# --- Canvas Item Tags ---
+AXES_TAG = "axes"
+LAYER_TAG = "layer"   # plus "layer:<TYPE>" for each layer polygon
+LABEL_TAG = "label"   # leaders, dimensions and annotation text
+TITLE_TAG = "title"
+
+# --- Transformation Functions ---
+
+def to_canvas_x(offset):
+    return ORIGIN_X + (offset * SCALE)
+
+def to_canvas_y(elevation):
+    return ORIGIN_Y - (elevation * SCALE)
+
+def to_canvas_coords(data, origin_x=ORIGIN_X, origin_y=ORIGIN_Y, scale=SCALE):
+    """
+    Maps a whole flat [x1, y1, x2, y2, ...] coordinate buffer to canvas
+    space at once and returns it as a list ready for create_polygon.
+    """
+    canvas_coords = [0.0] * len(data)
+    canvas_coords[0::2] = [origin_x + x * scale for x in data[0::2]]
+    canvas_coords[1::2] = [origin_y - y * scale for y in data[1::2]]
+    return canvas_coords
+
+
+class Viewport:
+    """
+    Where the world is on the canvas: the canvas position of (0, 0), the
+    pixels per metre and the size of the visible canvas. Zooming and
+    panning change it; the module constants above are the default view.
+    """
+    __slots__ = ("origin_x", "origin_y", "scale", "width", "height")
+
+    def __init__(self, origin_x=ORIGIN_X, origin_y=ORIGIN_Y, scale=SCALE,
+                 width=CANVAS_WIDTH, height=CANVAS_HEIGHT):
+        self.origin_x = origin_x
+        self.origin_y = origin_y
+        self.scale = scale
+        self.width = width
+        self.height = height
+
+    def __eq__(self, other):
+        return (isinstance(other, Viewport) and self.origin_x == other.origin_x
+                and self.origin_y == other.origin_y and self.scale == other.scale
+                and self.width == other.width and self.height == other.height)
+
+    def __repr__(self):
+        return f"Viewport({self.origin_x:.1f}, {self.origin_y:.1f}, {self.scale:.3f})"
+
+    def copy(self):
+        """A snapshot of this view, unaffected by later zooming, panning or resizing."""
+        return Viewport(self.origin_x, self.origin_y, self.scale, self.width, self.height)
+
+    def to_canvas_x(self, offset):
+        return self.origin_x + (offset * self.scale)
+
+    def to_canvas_y(self, elevation):
+        return self.origin_y - (elevation * self.scale)
+
+    def to_canvas_coords(self, data):
+        return to_canvas_coords(data, self.origin_x, self.origin_y, self.scale)
+
+    def tolerance(self):
+        """LOD_PIXELS in metres at this zoom level."""
+        return LOD_PIXELS / self.scale
+
+    def visible_box(self, margin=0):
+        """The canvas, grown by margin pixels, as a world (x_min, y_min, x_max, y_max) box."""
+        return ((-margin - self.origin_x) / self.scale,
+                (self.origin_y - self.height - margin) / self.scale,
+                (self.width + margin - self.origin_x) / self.scale,
+                (self.origin_y + margin) / self.scale)
+
+    def on_canvas(self, x, y, margin=0):
+        """Whether canvas point (x, y) is within margin pixels of the canvas."""
+        return -margin <= x <= self.width + margin and -margin <= y <= self.height + margin
+
+    def layer_coords(self, layer):
+        """
+        Canvas coordinates of a layer polygon, or an empty list if none of
+        it is on the canvas. Layers wholly off the canvas are skipped by
+        their bounding box and ones partly on it are clipped to it. Dense
+        layers keep only the vertices that still show at this zoom level
+        (see road_geometry.LevelOfDetail).
+        """
+        box = self.visible_box(CLIP_MARGIN)
+        if layer.bbox is None or not boxes_overlap(layer.bbox, box):
+            return []
+        if len(layer) < LOD_MIN_POINTS:
+            data = layer.data
+        else:
+            data = layer.lod().simplified(self.tolerance())
+        if not box_contains(box, layer.bbox):
+            data = clip_polygon(data, box)
+        return self.to_canvas_coords(data)
+
+    def zoom_at(self, x, y, factor):
+        """Zooms by factor keeping canvas point (x, y) fixed, like canvas.scale(x, y, factor, factor)."""
+        self.origin_x = x + (self.origin_x - x) * factor
+        self.origin_y = y + (self.origin_y - y) * factor
+        self.scale *= factor
+
+    def pan(self, dx, dy):
+        """Shifts the view by (dx, dy) pixels, like canvas.move."""
+        self.origin_x += dx
+        self.origin_y += dy
+
+DEFAULT_VIEW = Viewport()
+
+# --- Analysis Helper Functions ---
+
+def find_y_at_x(data_coords, x_offset):
+    """
+    Finds the elevation (y) of a polygon at a specific offset (x)
+    using linear interpolation. This scans every segment; for repeated
+    queries on the same layer use layer.profile().y_at(x) instead.
+    """
+    for i in range(0, len(data_coords) - 2, 2):
+        x1, y1 = data_coords[i], data_coords[i+1]
+        x2, y2 = data_coords[i+2], data_coords[i+3]
+        
+        if x1 > x2:
+            x1, x2 = x2, x1
+            y1, y2 = y2, y1
+            
+        if x1 <= x_offset <= x2:
+            if x2 - x1 == 0:  # Vertical line
+                return min(y1, y2)
+            
+            t = (x_offset - x1) / (x2 - x1)
+            y = y1 + t * (y2 - y1)
+            return y
+    return None # Not found
+
+# --- Drawing Helper Functions ---
+
+def draw_dim_label(canvas, offset, elevation, text, leader_len=30, anchor="s", view=DEFAULT_VIEW):
+    """Draws a text label with a small vertical leader line."""
+    cx = view.to_canvas_x(offset)
+    cy = view.to_canvas_y(elevation)
+    if not view.on_canvas(cx, cy, LABEL_MARGIN):
+        return
+    
+    leader_y_end = cy - leader_len
+    text_y_pos = leader_y_end - 5
+    
+    if anchor == "n": # Draw leader down
+        leader_y_end = cy + leader_len
+        text_y_pos = leader_y_end + 5
+
+    canvas.create_line(cx, cy, cx, leader_y_end, fill="gray50", tags=LABEL_TAG)
+    canvas.create_text(cx, text_y_pos, text=text, anchor=anchor, tags=LABEL_TAG)
+
+def draw_horizontal_dim(canvas, y_elev, x1_off, x2_off, text, view=DEFAULT_VIEW):
+    """Draws a horizontal dimension line with text."""
+    y_canvas = view.to_canvas_y(y_elev)
+    x1_canvas = view.to_canvas_x(x1_off)
+    x2_canvas = view.to_canvas_x(x2_off)
+    if (not -LABEL_MARGIN <= y_canvas <= view.height + LABEL_MARGIN
+            or max(x1_canvas, x2_canvas) < 0 or min(x1_canvas, x2_canvas) > view.width):
+        return
+    
+    # Main horizontal line
+    canvas.create_line(x1_canvas, y_canvas, x2_canvas, y_canvas, fill="gray30", arrow="both", tags=LABEL_TAG)
+    
+    # Vertical ticks
+    canvas.create_line(x1_canvas, y_canvas - 5, x1_canvas, y_canvas + 5, fill="gray30", tags=LABEL_TAG)
+    canvas.create_line(x2_canvas, y_canvas - 5, x2_canvas, y_canvas + 5, fill="gray30", tags=LABEL_TAG)
+    
+    # Text
+    mid_x = (x1_canvas + x2_canvas) / 2
+    canvas.create_text(mid_x, y_canvas - 5, text=text, anchor="s", fill="gray30", tags=LABEL_TAG)
+
+
+def draw_slope_label(canvas, p1, p2, view=DEFAULT_VIEW):
+    """Draws a 1:N slope label between two data points."""
+    offset1, elev1 = p1
+    offset2, elev2 = p2
+    
+    mid_offset = (offset1 + offset2) / 2
+    mid_elev = (elev1 + elev2) / 2
+    
+    run = abs(offset2 - offset1)
+    rise = abs(elev2 - elev1)
+    
+    if rise == 0:
+        slope_text = "Level"
+    else:
+        n = run / rise
+        slope_text = f"1 : {n:.1f}"
+
+    cx = view.to_canvas_x(mid_offset)
+    cy = view.to_canvas_y(mid_elev)
+    if not view.on_canvas(cx, cy, LABEL_MARGIN):
+        return
+    angle = math.degrees(math.atan2(view.to_canvas_y(elev2) - view.to_canvas_y(elev1), 
+                                   view.to_canvas_x(offset2) - view.to_canvas_x(offset1)))
+    
+    canvas.create_text(cx, cy, text=slope_text, angle=-angle, fill="blue", tags=LABEL_TAG)
+    
+    if elev1 > elev2:
+        zone = "FILL\n(Embankment)"
+    else:
+        zone = "CUT\n(Cutting)"
+    
+    canvas.create_text(cx, cy + 30, text=zone, fill="darkblue", font=("Arial", 9), tags=LABEL_TAG)
+
+# --- Section Rendering ---
+
+def draw_road_section(canvas, section, analysis=None, view=DEFAULT_VIEW):
+    """
+    Draws the axes, layers, labels and dimensions of one Section as seen
+    through view. The labels come from analysis (see road_analysis),
+    worked out here unless the caller already has it.
+    """
+    layers_data = section.layers
+    canvas.create_line(0, view.origin_y, view.width, view.origin_y, fill="grey", dash=(2, 2), tags=AXES_TAG)
+    canvas.create_line(view.origin_x, 0, view.origin_x, view.height, fill="grey", dash=(2, 2), tags=AXES_TAG)
+    canvas.create_text(view.origin_x + 5, view.origin_y + 5, text="(0, 0) Centerline", anchor="nw", tags=AXES_TAG)
+
+    # --- DRAW LAYERS (Bottom-up) ---
+    with stage("draw layers") as s:
+        # Draw terrain first, with stippling
+        # Layers off the canvas are culled, and ones crossing its edge clipped
+        terrain = section.find_layer("TERRAIN")
+        coords = view.layer_coords(terrain) if terrain else []
+        if len(coords) >= 6:
+            canvas.create_polygon(coords, 
+                                  fill=terrain.color, 
+                                  outline="darkgreen", 
+                                  width=1,
+                                  stipple="gray25",
+                                  tags=(LAYER_TAG, "layer:TERRAIN"))
+            s.add(len(coords) // 2)
+    
+        # Draw other layers (non-terrain)
+        for layer in layers_data:
+            if layer.type == "TERRAIN":
+                continue
+
+            coords = view.layer_coords(layer)
+            if len(coords) < 6:
+                continue
+            canvas.create_polygon(coords, 
+                                  fill=layer.color, 
+                                  outline="white", 
+                                  width=1,
+                                  tags=(LAYER_TAG, "layer:" + layer.type))
+            s.add(len(coords) // 2)
+
+    # --- ADD LABELS AND DIMENSIONS ---
+    if analysis is None:
+        with stage("analyze") as s:
+            analysis = analyze_section(section)
+            s.add(len(layers_data))
+
+    with stage("draw labels"):
+        canvas.create_text(view.width / 2, 25, 
+                           text=f"Chainage: {section.chainage}", 
+                           font=("Arial", 16, "bold"),
+                           tags=TITLE_TAG)
+
+        if analysis.layout == SIMPLE:
+            cl_elev = analysis.centerline_elevation
+            if cl_elev is not None:
+                draw_dim_label(canvas, 0, cl_elev, f"Centerline\n(Elev: {cl_elev:.2f}m)", view=view)
+
+            # Label Edges of Pavement
+            (ep_left_off, ep_left_elev), (ep_right_off, ep_right_elev) = analysis.carriageways[0]
+            draw_dim_label(canvas, ep_left_off, ep_left_elev, 
+                           f"E.P.\n({ep_left_off:.2f}, {ep_left_elev:.2f})", view=view)
+            draw_dim_label(canvas, ep_right_off, ep_right_elev, 
+                           f"E.P.\n({ep_right_off:.2f}, {ep_right_elev:.2f})", view=view)
+        
+            # Add horizontal dimension
+            width = ep_right_off - ep_left_off
+            draw_horizontal_dim(canvas, cl_elev + 1.0, ep_left_off, ep_right_off, f"Width: {width:.2f}m", view=view)
+
+        elif analysis.layout == DIVIDED:
+            # Label Centerline (at y=0)
+            draw_dim_label(canvas, 0, 0, "Centerline\n(Median)", anchor="n", view=view)
+
+            # Label each carriageway, left then right
+            for (inner_off, inner_elev), (outer_off, outer_elev) in analysis.carriageways:
+                draw_dim_label(canvas, inner_off, inner_elev, 
+                               f"E.P.\n({inner_off:.2f}, {inner_elev:.2f})", view=view)
+                draw_dim_label(canvas, outer_off, outer_elev, 
+                               f"E.P.\n({outer_off:.2f}, {outer_elev:.2f})", view=view)
+                width = abs(outer_off - inner_off)
+                draw_horizontal_dim(canvas, inner_elev + 0.5, inner_off, outer_off, f"Width: {width:.2f}m", view=view)
+        
+        if analysis.median_point:
+            m_off, m_elev = analysis.median_point
+            draw_dim_label(canvas, m_off + 0.5, m_elev, "Median\nBarrier", leader_len=15, view=view)
+
+        # Label Slopes
+        for p_road, p_terrain in analysis.slopes:
+            draw_slope_label(canvas, p_road, p_terrain, view=view)
@@ -0,0 +1,103 @@
+"""
+Cut and fill areas of a cross-section.
+
+The original ground is the TERRAIN surface and the design formation is
+the SUBBASE surface: the first x-monotone edge of each polygon, which
+runs from catch point to catch point. Between the catch points, ground
+above formation is cut and formation above ground is fill. The two
+profiles are merged at every vertex of either one, and each strip
+between neighbouring vertices is split where the lines cross, so the
+areas are exact and the cost is linear in the vertex count.
+
+Material areas (BASE, ASPHALT, ...) are the polygon areas of every
+non-terrain layer, summed per layer type.
+"""
+import heapq
+
+from road_geometry import interpolate_sorted, polygon_area
+from road_parser import parse_station
+
+GROUND_LAYER = "TERRAIN"
+FORMATION_LAYER = "SUBBASE"
+
+
+class SectionAreas:
+    """Cut, fill and per-material areas (m^2) of one cross-section."""
+    __slots__ = ("chainage", "station", "cut", "fill", "materials")
+
+    def __init__(self, chainage, station, cut=0.0, fill=0.0, materials=None):
+        self.chainage = chainage
+        self.station = station
+        self.cut = cut
+        self.fill = fill
+        self.materials = materials if materials is not None else {}
+
+    def __repr__(self):
+        return (f"SectionAreas({self.chainage!r}, cut={self.cut:.3f}, "
+                f"fill={self.fill:.3f}, materials={len(self.materials)})")
+
+
+def cut_fill_between(ground, formation):
+    """
+    Returns (cut, fill) areas between two x-sorted profiles given as
+    (xs, ys), over the stretch where both are defined.
+    """
+    ground_xs, ground_ys = ground
+    formation_xs, formation_ys = formation
+    if len(ground_xs) < 2 or len(formation_xs) < 2:
+        return 0.0, 0.0
+
+    start = max(ground_xs[0], formation_xs[0])
+    stop = min(ground_xs[-1], formation_xs[-1])
+    if stop <= start:
+        return 0.0, 0.0
+
+    breaks = [start]
+    for x in heapq.merge(ground_xs, formation_xs):
+        if start < x < stop and x != breaks[-1]:
+            breaks.append(x)
+    breaks.append(stop)
+
+    ground_at = interpolate_sorted(ground_xs, ground_ys, breaks)
+    formation_at = interpolate_sorted(formation_xs, formation_ys, breaks)
+    depths = [g - f for g, f in zip(ground_at, formation_at)]
+
+    cut = fill = 0.0
+    for x0, x1, d0, d1 in zip(breaks, breaks[1:], depths, depths[1:]):
+        width = x1 - x0
+        if d0 >= 0 and d1 >= 0:
+            cut += (d0 + d1) / 2 * width
+        elif d0 <= 0 and d1 <= 0:
+            fill -= (d0 + d1) / 2 * width
+        else:
+            # The lines cross inside the strip: two triangles either side
+            crossing = d0 / (d0 - d1) * width
+            first, second = d0 * crossing / 2, d1 * (width - crossing) / 2
+            cut += max(first, 0) + max(second, 0)
+            fill -= min(first, 0) + min(second, 0)
+    return cut, fill
+
+def material_areas(section):
+    """Polygon areas of all non-terrain layers, summed by layer type."""
+    materials = {}
+    for layer in section.layers:
+        if layer.type == GROUND_LAYER:
+            continue
+        materials[layer.type] = materials.get(layer.type, 0.0) + polygon_area(layer.data)
+    return materials
+
+def section_areas(section, ground_type=GROUND_LAYER, formation_type=FORMATION_LAYER):
+    """Computes the cut, fill and material areas of a Section."""
+    areas = SectionAreas(section.chainage, parse_station(section.chainage),
+                         materials=material_areas(section))
+    ground = section.find_layer(ground_type)
+    formation = section.find_layer(formation_type)
+    if ground and formation:
+        areas.cut, areas.fill = cut_fill_between(ground.profile().surface(),
+                                                 formation.profile().surface())
+    return areas
+
+def corridor_areas(sections):
+    """Yields SectionAreas for a stream of Sections, one at a time."""
+    for section in sections:
+        yield section_areas(section)
@@ -0,0 +1,46 @@
+"""
+Encapsulated PostScript export through Tk's own canvas.postscript(),
+so it needs nothing beyond Tk itself.
+
+export_canvas() saves whatever is on a canvas (the GUI's export button
+uses it). EpsExporter draws sections onto one canvas in a withdrawn Tk
+root and saves each in turn, so a batch of thousands of files opens a
+single hidden window rather than one per file.
+"""
+import tkinter as tk
+
+from road_drawing import CANVAS_WIDTH, CANVAS_HEIGHT, draw_road_section
+from road_timing import stage
+
+def export_canvas(canvas, filepath, width=CANVAS_WIDTH, height=CANVAS_HEIGHT):
+    """Writes the width x height top-left area of canvas to filepath as EPS."""
+    with stage("postscript"):
+        # Explicit sizes, since a withdrawn canvas has no size of its own
+        canvas.postscript(file=filepath, x=0, y=0, width=width, height=height,
+                          pagewidth=f"{width}p", colormode="color")
+    return filepath
+
+
+class EpsExporter:
+    """Draws sections on a hidden canvas and saves each as EPS; close() when done."""
+
+    def __init__(self, width=CANVAS_WIDTH, height=CANVAS_HEIGHT, bg="ivory"):
+        self.width = width
+        self.height = height
+        self.root = tk.Tk()
+        self.root.withdraw()
+        self.canvas = tk.Canvas(self.root, width=width, height=height, bg=bg, highlightthickness=0)
+
+    def export(self, section, filepath):
+        self.canvas.delete("all")
+        draw_road_section(self.canvas, section)
+        return export_canvas(self.canvas, filepath, self.width, self.height)
+
+    def close(self):
+        self.root.destroy()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,403 @@
+"""
+Geometry helpers that work directly on the flat [x1, y1, x2, y2, ...]
+coordinate buffers of a Layer.
+"""
+import bisect
+import math
+from array import array
+
+NAN = math.nan
+
+
+class PreparedPolyline:
+    """
+    A polyline indexed for fast elevation lookups.
+
+    find_y_at_x() scans the segments in order and returns the first one
+    that spans the offset. To give the same answers in O(log n), the
+    polyline is split once into maximal runs that move strictly one way
+    in x. Each run is stored sorted by x and searched with bisect, and
+    runs are tried in their original order. A vertical segment becomes a
+    run of its own and reports the lower of its two ends, like
+    find_y_at_x does.
+
+    A terrain polygon has only a few runs (the surface, the drop to the
+    base and the base), so a query costs a handful of binary searches.
+    """
+
+    def __init__(self, data):
+        self.runs = []  # (xs, ys) with xs ascending; len(xs) == 1 for a vertical segment
+        run_xs, run_ys, direction = [], [], 0
+
+        for i in range(0, len(data) - 2, 2):
+            x1, y1, x2, y2 = data[i], data[i+1], data[i+2], data[i+3]
+            step = (x2 > x1) - (x2 < x1)
+            if step != direction or step == 0:
+                self._add_run(run_xs, run_ys, direction)
+                run_xs, run_ys, direction = [x1], [y1], step
+            if step == 0:
+                self._add_run([x1], [min(y1, y2)], 0)
+                run_xs, run_ys, direction = [], [], 0
+            else:
+                run_xs.append(x2)
+                run_ys.append(y2)
+        self._add_run(run_xs, run_ys, direction)
+
+        self.bounds = [(xs[0], xs[-1]) for xs, ys in self.runs]
+        # The edge back to the start, which closes the polygon of a layer
+        self.closing = (data[-2], data[-1], data[0], data[1]) if len(data) >= 4 else None
+
+    def _add_run(self, xs, ys, direction):
+        if not xs or (direction != 0 and len(xs) < 2):
+            return
+        if direction < 0:
+            xs.reverse()
+            ys.reverse()
+        self.runs.append((xs, ys))
+
+    @staticmethod
+    def _interpolate(xs, ys, x_offset):
+        if len(xs) == 1:
+            return ys[0]
+        i = min(bisect.bisect_right(xs, x_offset), len(xs) - 1) - 1
+        x1, x2 = xs[i], xs[i + 1]
+        t = (x_offset - x1) / (x2 - x1)
+        return ys[i] + t * (ys[i + 1] - ys[i])
+
+    def surface(self):
+        """
+        The first stretch of the polyline that runs one way in x, as
+        (xs, ys) sorted by x. For a layer polygon that is the edge drawn
+        first, e.g. the ground line of TERRAIN.
+        """
+        for xs, ys in self.runs:
+            if len(xs) > 1:
+                return xs, ys
+        return [], []
+
+    def y_at(self, x_offset):
+        """Elevation at an offset, or None if no segment spans it."""
+        for (x_min, x_max), (xs, ys) in zip(self.bounds, self.runs):
+            if x_min <= x_offset <= x_max:
+                return self._interpolate(xs, ys, x_offset)
+        return None
+
+    def y_at_many(self, offsets):
+        """
+        Elevations at many offsets, as a list with None where no segment
+        spans the offset. The offsets are sorted once and swept along
+        each run, every search starting where the previous one ended.
+        """
+        count = len(offsets)
+        results = [None] * count
+        order = sorted(range(count), key=offsets.__getitem__)
+        sorted_offsets = [offsets[j] for j in order]
+
+        for (x_min, x_max), (xs, ys) in zip(self.bounds, self.runs):
+            lo = bisect.bisect_left(sorted_offsets, x_min)
+            hi = bisect.bisect_right(sorted_offsets, x_max)
+            if len(xs) == 1:
+                for k in range(lo, hi):
+                    if results[order[k]] is None:
+                        results[order[k]] = ys[0]
+                continue
+
+            i = 0
+            last = len(xs) - 1
+            for k in range(lo, hi):
+                j = order[k]
+                if results[j] is not None:
+                    continue
+                x_offset = sorted_offsets[k]
+                # Offsets are sorted, so each search starts where the last one ended
+                i = max(bisect.bisect_left(xs, x_offset, i + 1, last) - 1, i)
+                x1, x2 = xs[i], xs[i + 1]
+                results[j] = ys[i] + (x_offset - x1) / (x2 - x1) * (ys[i + 1] - ys[i])
+        return results
+
+    def envelope_at_many(self, offsets, top=True, closed=True):
+        """
+        The highest (top=True) or lowest of all the segments spanning each
+        offset, as a list with None where none does. With closed, the edge
+        from the last vertex back to the first counts too, so for a layer
+        polygon this is its top or bottom surface, whichever edge it lists
+        first.
+        """
+        count = len(offsets)
+        results = [None] * count
+        order = sorted(range(count), key=offsets.__getitem__)
+        sorted_offsets = [offsets[j] for j in order]
+        pick = max if top else min
+
+        runs = list(zip(self.bounds, self.runs))
+        if closed and self.closing is not None:
+            x1, y1, x2, y2 = self.closing
+            if x1 != x2:
+                xs, ys = ([x1, x2], [y1, y2]) if x1 < x2 else ([x2, x1], [y2, y1])
+                runs.append(((xs[0], xs[1]), (xs, ys)))
+
+        for (x_min, x_max), (xs, ys) in runs:
+            lo = bisect.bisect_left(sorted_offsets, x_min)
+            hi = bisect.bisect_right(sorted_offsets, x_max)
+            i = 0
+            last = len(xs) - 1
+            for k in range(lo, hi):
+                if last == 0:
+                    y = ys[0]
+                else:
+                    x_offset = sorted_offsets[k]
+                    i = max(bisect.bisect_left(xs, x_offset, i + 1, last) - 1, i)
+                    x1, x2 = xs[i], xs[i + 1]
+                    y = ys[i] + (x_offset - x1) / (x2 - x1) * (ys[i + 1] - ys[i])
+                j = order[k]
+                results[j] = y if results[j] is None else pick(results[j], y)
+        return results
+
+
+def polygon_area(data):
+    """Area of the polygon in a flat coordinate buffer (shoelace formula, always >= 0)."""
+    xs, ys = data[0::2], data[1::2]
+    if len(xs) < 3:
+        return 0.0
+    twice_area = xs[-1] * ys[0] - xs[0] * ys[-1]
+    twice_area += sum(x1 * y2 - x2 * y1 for x1, y1, x2, y2 in zip(xs, ys, xs[1:], ys[1:]))
+    return abs(twice_area) / 2
+
+def data_bounds(data):
+    """(x_min, y_min, x_max, y_max) of a flat coordinate buffer, or None if it is empty."""
+    if len(data) < 2:
+        return None
+    xs, ys = data[0::2], data[1::2]
+    return min(xs), min(ys), max(xs), max(ys)
+
+def boxes_overlap(a, b):
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+def box_contains(outer, inner):
+    return (outer[0] <= inner[0] and outer[1] <= inner[1]
+            and inner[2] <= outer[2] and inner[3] <= outer[3])
+
+def clip_polygon(data, box):
+    """
+    Clips the polygon in a flat coordinate buffer to the rectangle box
+    (x_min, y_min, x_max, y_max) with the Sutherland-Hodgman algorithm,
+    one edge of the rectangle at a time. Returns the clipped flat
+    coordinates, empty if nothing is left.
+    """
+    points = list(zip(data[0::2], data[1::2]))
+    x_min, y_min, x_max, y_max = box
+    # (axis, limit, keep the side above the limit?)
+    for axis, limit, above in ((0, x_min, True), (0, x_max, False),
+                               (1, y_min, True), (1, y_max, False)):
+        if not points:
+            break
+        clipped = []
+        previous = points[-1]
+        previous_in = (previous[axis] >= limit) if above else (previous[axis] <= limit)
+        for point in points:
+            inside = (point[axis] >= limit) if above else (point[axis] <= limit)
+            if inside != previous_in:
+                t = (limit - previous[axis]) / (point[axis] - previous[axis])
+                crossing = [previous[0] + t * (point[0] - previous[0]),
+                            previous[1] + t * (point[1] - previous[1])]
+                crossing[axis] = limit
+                clipped.append(tuple(crossing))
+            if inside:
+                clipped.append(point)
+            previous, previous_in = point, inside
+        points = clipped
+
+    result = array('d')
+    for x, y in points:
+        result.append(x)
+        result.append(y)
+    return result
+
+def interpolate_sorted(xs, ys, queries):
+    """Linear interpolation of the x-sorted polyline (xs, ys) at sorted, in-range queries."""
+    values = []
+    i = 0
+    last = len(xs) - 1
+    for x in queries:
+        i = max(bisect.bisect_left(xs, x, i + 1, last) - 1, i)
+        x1, x2 = xs[i], xs[i + 1]
+        values.append(ys[i] + (x - x1) / (x2 - x1) * (ys[i + 1] - ys[i]))
+    return values
+
+RAY_BLOCK = 64
+
+def ray_crossing(xs, ys, x0, y0, rise, direction):
+    """
+    First point where the ray from (x0, y0), going direction (+1 or -1)
+    in x and climbing rise per unit of x travelled, meets the x-sorted
+    polyline (xs, ys); None if it leaves the polyline first.
+
+    The start is found with bisect and the vertices are then visited
+    outwards until the height of the polyline above the ray changes
+    sign, RAY_BLOCK at a time: a block that stays on one side of the ray
+    is skipped with a single min() or max(), and only the block where
+    the sign changes is walked vertex by vertex.
+    """
+    if len(xs) < 2 or not xs[0] <= x0 <= xs[-1]:
+        return None
+
+    i = min(max(bisect.bisect_right(xs, x0) - 1, 0), len(xs) - 2)
+    start = ys[i] + (x0 - xs[i]) / (xs[i + 1] - xs[i]) * (ys[i + 1] - ys[i]) - y0
+    if start == 0:
+        return x0, y0
+    prev_x, prev_gap = x0, start
+    step = 1 if direction > 0 else -1
+    j = i + 1 if direction > 0 else i
+    while 0 <= j < len(xs):
+        end = min(j + RAY_BLOCK, len(xs)) if step > 0 else max(j - RAY_BLOCK, -1)
+        last = end - step
+        ray_first, ray_last = y0 + rise * abs(xs[j] - x0), y0 + rise * abs(xs[last] - x0)
+        # The ray is straight, so a block of vertices wholly on one side of
+        # both its end heights cannot hold the crossing
+        block = ys[j:end] if step > 0 else ys[end + 1:j + 1]
+        if prev_gap > 0:
+            skip = min(block) > max(ray_first, ray_last)
+        else:
+            skip = max(block) < min(ray_first, ray_last)
+        if skip:
+            prev_x, prev_gap = xs[last], ys[last] - ray_last
+            j = end
+            continue
+        for k in range(j, end, step):
+            if xs[k] == x0:
+                continue
+            here = ys[k] - (y0 + rise * abs(xs[k] - x0))
+            if here == 0 or (here > 0) != (prev_gap > 0):
+                # Polyline and ray are both straight between the two vertices
+                x = prev_x + prev_gap / (prev_gap - here) * (xs[k] - prev_x)
+                return x, y0 + rise * abs(x - x0)
+            prev_x, prev_gap = xs[k], here
+        j = end
+    return None
+
+
+# --- Level of Detail ---
+
+class LevelOfDetail:
+    """
+    A Douglas-Peucker hierarchy of a polyline's vertices, for drawing it
+    with only as many points as the zoom level can show.
+
+    Douglas-Peucker keeps the vertex farthest from the chord between two
+    kept vertices, then recurses on both halves. Running it once to the
+    end and noting that distance for each vertex gives its significance:
+    the largest tolerance at which it would still be kept. Each vertex is
+    capped at its parent's significance, so the vertices kept at any
+    tolerance form the same nested set DP itself would produce. The ends
+    are always kept.
+
+    Vertices are ordered by decreasing significance once, so picking the
+    ones for a tolerance is a binary search plus sorting the survivors.
+    """
+    __slots__ = ("data", "order", "thresholds", "_last")
+
+    def __init__(self, data):
+        self.data = data
+        count = len(data) // 2
+        significance = [0.0] * count
+        if count:
+            significance[0] = significance[-1] = math.inf
+        stack = [(0, count - 1, math.inf)] if count > 2 else []
+        while stack:
+            first, last, cap = stack.pop()
+            ax, ay = data[2 * first], data[2 * first + 1]
+            dx, dy = data[2 * last] - ax, data[2 * last + 1] - ay
+            length = math.hypot(dx, dy)
+            best, best_distance = first + 1, -1.0
+            for i in range(first + 1, last):
+                px, py = data[2 * i] - ax, data[2 * i + 1] - ay
+                if length > 0:
+                    distance = abs(px * dy - py * dx) / length
+                else:
+                    # Closed ring: the chord is a point
+                    distance = math.hypot(px, py)
+                if distance > best_distance:
+                    best, best_distance = i, distance
+            level = min(best_distance, cap)
+            significance[best] = level
+            if best - first > 1:
+                stack.append((first, best, level))
+            if last - best > 1:
+                stack.append((best, last, level))
+
+        self.order = sorted(range(count), key=significance.__getitem__, reverse=True)
+        # Negated so they ascend, for bisect
+        self.thresholds = [-significance[i] for i in self.order]
+        self._last = None  # (tolerance, simplified data)
+
+    def __len__(self):
+        return len(self.order)
+
+    def count_at(self, tolerance):
+        """How many vertices are kept at a tolerance."""
+        return bisect.bisect_right(self.thresholds, -tolerance)
+
+    def simplified(self, tolerance):
+        """
+        Flat coordinates of the vertices more significant than tolerance
+        (in data units), in their original order. The last result is
+        remembered, since a section is redrawn at one zoom level many times.
+        """
+        if self._last is not None and self._last[0] == tolerance:
+            return self._last[1]
+        count = self.count_at(tolerance)
+        if count >= len(self.order):
+            result = self.data
+        else:
+            data = self.data
+            result = array('d')
+            for i in sorted(self.order[:count]):
+                result.append(data[2 * i])
+                result.append(data[2 * i + 1])
+        self._last = (tolerance, result)
+        return result
+
+
+# --- Batch Sampling ---
+
+TOP = "top"
+BOTTOM = "bottom"
+
+def sample_offsets(start, stop, step):
+    """Evenly spaced offsets from start to stop inclusive, e.g. every 0.1 m."""
+    count = int(round((stop - start) / step)) + 1
+    return [start + i * step for i in range(count)]
+
+def sample_elevations(section, layer_types, offsets, surface=None):
+    """
+    Samples several layers of a Section at the same offsets in one pass.
+
+    surface is TOP or BOTTOM for that side of each layer polygon, or None
+    for the edge the layer lists first (e.g. the ground line of TERRAIN,
+    the formation of SUBBASE). Returns one array('d') row per entry of
+    layer_types, each with one elevation per offset; NaN marks offsets a
+    layer does not cover (or layers the section does not have).
+    """
+    matrix = []
+    for layer_type in layer_types:
+        layer = section.find_layer(layer_type)
+        if layer is None:
+            matrix.append(array('d', [NAN]) * len(offsets))
+            continue
+        if surface is None:
+            row = layer.profile().y_at_many(offsets)
+        else:
+            row = layer.profile().envelope_at_many(offsets, top=surface == TOP)
+        matrix.append(array('d', [NAN if y is None else y for y in row]))
+    return matrix
+
+def layer_thickness(section, upper_type, lower_type, offsets, upper_surface=TOP, lower_surface=TOP):
+    """
+    Vertical distance from a surface of one layer down to a surface of
+    another at each offset (NaN where either is missing). By default both
+    are top surfaces, which gives the thickness of the upper layer where
+    it sits on the lower one: ASPHALT over BASE is the asphalt depth.
+    """
+    upper, = sample_elevations(section, (upper_type,), offsets, upper_surface)
+    lower, = sample_elevations(section, (lower_type,), offsets, lower_surface)
+    return array('d', [u - l for u, l in zip(upper, lower)])
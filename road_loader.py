@@ -0,0 +1,156 @@
+"""
+Background section loading for the Tk window.
+
+Reading, parsing and analysing run on a worker thread. Finished results
+are put on a queue that the Tk thread drains with root.after(), so every
+widget is still only touched from the main loop. Starting a new load
+cancels the previous one: a queued job never runs, a running parse is
+stopped through its cancel event, and anything that still finishes is
+dropped because its generation number is stale.
+
+With timing on (see road_timing), each load's record is started on the
+worker and handed over with the result, so the callback's drawing on
+the Tk thread is timed as part of the same load.
+"""
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import road_timing
+from road_container import section_label
+from road_parser import LoadCancelled
+
+POLL_MS = 20
+
+
+class BackgroundLoader:
+    """Loads sections through a SectionCache off the Tk thread."""
+
+    def __init__(self, root, cache, workers=1, prepare=None):
+        self.root = root
+        self.cache = cache
+        self.prepare = prepare  # optional extra work on the worker, e.g. prerender
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="road-loader")
+        self.results = queue.Queue()
+        self.generation = 0
+        self.current = None  # (future, cancel event) of the latest load
+        self.polling = False
+
+    def load(self, filepath, on_done, on_error, entry=None):
+        """
+        Starts loading a section, cancelling any load still in progress.
+        on_done(cached) or on_error(exception) is later called on the Tk thread.
+        """
+        self.cancel()
+        generation = self.generation
+        cancel = threading.Event()
+
+        def job():
+            record = road_timing.start(section_label(filepath, entry))
+            try:
+                cached = self.cache.get(filepath, entry, cancel)
+                if self.prepare is not None:
+                    self.prepare(cached)
+            except LoadCancelled:
+                return
+            except Exception as e:
+                self.results.put((generation, on_error, e, record))
+            else:
+                self.results.put((generation, on_done, cached, record))
+            finally:
+                road_timing.activate(None)
+
+        self.current = (self.executor.submit(job), cancel)
+        self._schedule_poll()
+
+    def cancel(self):
+        """Abandons the current load, if any."""
+        self.generation += 1
+        if self.current is not None:
+            future, cancel = self.current
+            future.cancel()
+            cancel.set()
+            self.current = None
+
+    def busy(self):
+        return self.current is not None and not self.current[0].done()
+
+    def _schedule_poll(self):
+        if not self.polling:
+            self.polling = True
+            self.root.after(POLL_MS, self._poll)
+
+    def _poll(self):
+        self.polling = False
+        while True:
+            try:
+                generation, callback, value, record = self.results.get_nowait()
+            except queue.Empty:
+                break
+            if generation == self.generation:
+                self.current = None
+                road_timing.activate(record)
+                try:
+                    callback(value)
+                finally:
+                    road_timing.finish(record)
+        if self.busy() or not self.results.empty():
+            self._schedule_poll()
+
+    def shutdown(self):
+        self.cancel()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+class Prefetcher:
+    """
+    Speculatively loads sections into a SectionCache on background
+    threads, so that stepping to them later is a cache hit. Each call to
+    prefetch() replaces the previous wish list: work for items no longer
+    wanted is cancelled, work for items still wanted carries on.
+    """
+
+    def __init__(self, cache, workers=2, prepare=None):
+        self.cache = cache
+        self.prepare = prepare
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="road-prefetch")
+        self.pending = {}  # (filepath, entry) -> (future, cancel event)
+
+    def prefetch(self, items):
+        """Queues (filepath, entry) items, most wanted first."""
+        wanted = set(items)
+        for item in list(self.pending):
+            future, cancel = self.pending[item]
+            if item not in wanted or future.done():
+                future.cancel()
+                cancel.set()
+                del self.pending[item]
+        for item in items:
+            if item not in self.pending:
+                cancel = threading.Event()
+                self.pending[item] = (self.executor.submit(self._fetch, *item, cancel), cancel)
+
+    def _fetch(self, filepath, entry, cancel):
+        record = road_timing.start(section_label(filepath, entry), kind="prefetch")
+        try:
+            cached = self.cache.get(filepath, entry, cancel)
+            if self.prepare is not None:
+                self.prepare(cached)
+        except LoadCancelled:
+            record = None
+        except Exception as e:
+            # Only a guess that failed; the real load will report it
+            print(f"[PREFETCH FAILED] {filepath} {entry}: {e}")
+        finally:
+            road_timing.activate(None)
+            road_timing.finish(record)
+
+    def cancel(self):
+        for future, cancel in self.pending.values():
+            future.cancel()
+            cancel.set()
+        self.pending = {}
+
+    def shutdown(self):
+        self.cancel()
+        self.executor.shutdown(wait=False, cancel_futures=True)
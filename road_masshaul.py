@@ -0,0 +1,158 @@
+"""
+Mass-haul diagram for a corridor.
+
+Volume rows (see road_volumes.py) are consumed in station order. Each
+row's cut is scaled by cut_factor, to convert in-situ cut into the
+compacted fill it will make (below 1 for shrinkage, e.g. 0.9 for common
+earth; above 1 for bulking rock). Each row's fill is scaled by
+fill_factor, e.g. for a compaction allowance. The mass ordinate is the
+running total of factored cut minus factored fill.
+
+The curve is binned into one column per output pixel as the rows
+arrive (min, max and last ordinate per column). A corridor of any
+length therefore needs only O(width) memory, and the drawing has at
+most a few points per pixel.
+
+    python road_masshaul.py corridor.roads --cut-factor 0.9 -o masshaul.svg
+"""
+import argparse
+import sys
+
+from road_container import collect_road_files, corridor_index
+from road_svg import SvgCanvas
+from road_volumes import AVERAGE_END_AREA, PRISMOIDAL, corridor_volumes
+
+PLOT_WIDTH = 1000
+PLOT_HEIGHT = 400
+MARGIN = 50
+
+
+class MassHaulCurve:
+    """Accumulates factored mass ordinates into per-pixel columns between two stations."""
+
+    def __init__(self, start_station, end_station, columns=PLOT_WIDTH - 2 * MARGIN,
+                 cut_factor=1.0, fill_factor=1.0):
+        self.start_station = start_station
+        self.end_station = end_station
+        self.cut_factor = cut_factor
+        self.fill_factor = fill_factor
+        self.mass = 0.0
+        self.min_mass = self.max_mass = 0.0
+        self.total_cut = self.total_fill = 0.0
+        self.balance_stations = []  # where the curve crosses zero
+        # Per column: [min, max, last] mass, or None until a row lands there
+        self.columns = [None] * columns
+
+    def column_of(self, station):
+        """Index of the pixel column a station falls in."""
+        span = self.end_station - self.start_station
+        fraction = (station - self.start_station) / span if span > 0 else 0.0
+        return min(max(int(fraction * len(self.columns)), 0), len(self.columns) - 1)
+
+    def add_row(self, row):
+        """Adds one VolumeRow and returns the new mass ordinate."""
+        cut = row.cut * self.cut_factor
+        fill = row.fill * self.fill_factor
+        previous = self.mass
+        self.mass += cut - fill
+        self.total_cut += cut
+        self.total_fill += fill
+        self.min_mass = min(self.min_mass, self.mass)
+        self.max_mass = max(self.max_mass, self.mass)
+        if (previous < 0 <= self.mass) or (previous > 0 >= self.mass):
+            t = previous / (previous - self.mass)
+            self.balance_stations.append(row.start_station + t * (row.end_station - row.start_station))
+
+        x = self.column_of(row.end_station)
+        column = self.columns[x]
+        if column is None:
+            self.columns[x] = [self.mass, self.mass, self.mass]
+        else:
+            column[0] = min(column[0], self.mass)
+            column[1] = max(column[1], self.mass)
+            column[2] = self.mass
+        return self.mass
+
+    def add_rows(self, rows):
+        for row in rows:
+            self.add_row(row)
+        return self
+
+    def polyline(self):
+        """Yields (column, mass) points tracing the curve, including each column's extremes."""
+        yield 0, 0.0
+        for x, column in enumerate(self.columns):
+            if column is None:
+                continue
+            low, high, last = column
+            if low != high:
+                # Keep the spikes: visit the extremes in the order the curve ends up
+                yield from ((x, high), (x, low)) if last == low else ((x, low), (x, high))
+            yield x, last
+
+
+def draw_mass_haul(canvas, curve, title="Mass-Haul Diagram", width=PLOT_WIDTH, height=PLOT_HEIGHT):
+    """Draws a MassHaulCurve with its zero line, axes and balance points."""
+    plot_w = width - 2 * MARGIN
+    plot_h = height - 2 * MARGIN
+    low, high = curve.min_mass, curve.max_mass
+    if high == low:
+        high, low = high + 1, low - 1
+
+    def to_y(mass):
+        return MARGIN + (high - mass) / (high - low) * plot_h
+
+    def to_x(column):
+        return MARGIN + column * plot_w / len(curve.columns)
+
+    canvas.create_line(MARGIN, MARGIN, MARGIN, height - MARGIN, fill="gray30")
+    canvas.create_line(MARGIN, to_y(0), width - MARGIN, to_y(0), fill="gray50", dash=(4, 2))
+    canvas.create_text(width / 2, 20, text=title, font=("Arial", 14, "bold"))
+    canvas.create_text(MARGIN - 5, to_y(high), text=f"{high:,.0f} m³", anchor="e", font=("Arial", 8))
+    canvas.create_text(MARGIN - 5, to_y(low), text=f"{low:,.0f} m³", anchor="e", font=("Arial", 8))
+    canvas.create_text(MARGIN, height - MARGIN + 15, text=f"{curve.start_station:.0f} m", anchor="w")
+    canvas.create_text(width - MARGIN, height - MARGIN + 15, text=f"{curve.end_station:.0f} m", anchor="e")
+
+    coords = []
+    for column, mass in curve.polyline():
+        coords += [to_x(column), to_y(mass)]
+    if len(coords) >= 4:
+        canvas.create_line(coords, fill="blue", width=2)
+
+    for station in curve.balance_stations:
+        x = to_x(curve.column_of(station))
+        canvas.create_line(x, to_y(0) - 5, x, to_y(0) + 5, fill="red")
+
+    canvas.create_text(width - MARGIN, MARGIN - 15, anchor="e", font=("Arial", 9),
+                       text=(f"Cut {curve.total_cut:,.0f} m³   Fill {curve.total_fill:,.0f} m³   "
+                             f"Net {curve.mass:,.0f} m³"))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Draw the mass-haul diagram of a corridor.")
+    parser.add_argument("paths", nargs="+", help=".road/.roads files or directories")
+    parser.add_argument("-o", "--output", default="masshaul.svg", help="SVG file to write")
+    parser.add_argument("--method", choices=(AVERAGE_END_AREA, PRISMOIDAL), default=AVERAGE_END_AREA)
+    parser.add_argument("--cut-factor", type=float, default=1.0,
+                        help="shrinkage (<1) or bulking (>1) applied to cut volumes")
+    parser.add_argument("--fill-factor", type=float, default=1.0, help="factor applied to fill volumes")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="worker processes (default: one per core)")
+    args = parser.parse_args(argv)
+
+    index = corridor_index(collect_road_files(args.paths))
+    if len(index) < 2:
+        print("Need at least two sections with a numeric chainage.", file=sys.stderr)
+        return 1
+
+    curve = MassHaulCurve(index[0][0], index[-1][0],
+                          cut_factor=args.cut_factor, fill_factor=args.fill_factor)
+    curve.add_rows(corridor_volumes(index, args.method, args.jobs))
+
+    canvas = SvgCanvas(PLOT_WIDTH, PLOT_HEIGHT, bg="white")
+    draw_mass_haul(canvas, curve)
+    canvas.write(args.output)
+    print(f"Net mass {curve.mass:,.1f} m³ over {len(index)} sections; wrote {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
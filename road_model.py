@@ -0,0 +1,92 @@
+"""
+Compact in-memory model of a parsed cross-section.
+
+A Section holds its chainage label and its layers in file (drawing)
+order. Each Layer keeps its coordinates as one flat, contiguous float64
+buffer [x1, y1, x2, y2, ...]: an array('d') when parsed from text, or a
+memoryview into a memory-mapped binary cache. Both classes use __slots__
+so a corridor of thousands of sections stays small.
+"""
+from array import array
+
+from road_geometry import LevelOfDetail, PreparedPolyline, data_bounds
+
+DEFAULT_CHAINAGE = "CHAINAGE: Unknown"
+
+
+class Layer:
+    """
+    One polygon of a section: its type (e.g. TERRAIN), colour and
+    coordinates, plus their bounding box (x_min, y_min, x_max, y_max),
+    worked out when the layer is made unless already known.
+    """
+    __slots__ = ("type", "color", "data", "bbox", "_profile", "_lod")
+
+    def __init__(self, layer_type, color, data, bbox=None):
+        self.type = layer_type
+        self.color = color
+        if not isinstance(data, (array, memoryview)):
+            data = array('d', data)
+        self.data = data
+        self.bbox = bbox if bbox is not None else data_bounds(data)
+        self._profile = None
+        self._lod = None
+
+    def __len__(self):
+        """Number of vertices."""
+        return len(self.data) // 2
+
+    def __repr__(self):
+        return f"Layer({self.type!r}, {self.color!r}, {len(self)} points)"
+
+    def point(self, i):
+        """Returns vertex i as (offset, elevation); negative indices count from the end."""
+        if i < 0:
+            i += len(self)
+        return self.data[2 * i], self.data[2 * i + 1]
+
+    def profile(self):
+        """The layer indexed for elevation lookups, built on first use."""
+        if self._profile is None:
+            self._profile = PreparedPolyline(self.data)
+        return self._profile
+
+    def lod(self):
+        """The layer's level-of-detail hierarchy for drawing, built on first use."""
+        if self._lod is None:
+            self._lod = LevelOfDetail(self.data)
+        return self._lod
+
+    def nbytes(self):
+        return len(self.data) * 8
+
+
+class Section:
+    """A parsed cross-section: chainage label plus layers in drawing order."""
+    __slots__ = ("chainage", "layers")
+
+    def __init__(self, chainage=DEFAULT_CHAINAGE, layers=None):
+        self.chainage = chainage
+        self.layers = layers if layers is not None else []
+
+    def __repr__(self):
+        return f"Section({self.chainage!r}, {len(self.layers)} layers)"
+
+    def find_layer(self, layer_type_name):
+        """Finds the first layer with the matching type."""
+        for layer in self.layers:
+            if layer.type == layer_type_name:
+                return layer
+        return None
+
+    def bbox(self):
+        """Bounding box of all layers, or None if there are none."""
+        boxes = [layer.bbox for layer in self.layers if layer.bbox is not None]
+        if not boxes:
+            return None
+        return (min(b[0] for b in boxes), min(b[1] for b in boxes),
+                max(b[2] for b in boxes), max(b[3] for b in boxes))
+
+    def nbytes(self):
+        """Approximate size of the coordinate data in bytes."""
+        return sum(layer.nbytes() for layer in self.layers)
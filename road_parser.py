@@ -0,0 +1,137 @@
+"""
+Reader for the plain-text .road cross-section format.
+
+    # CHAINAGE: 45+200.00 (Divided Highway - Cut Section)
+    layer_type,color,offset1,elevation1,offset2,elevation2,...
+
+Lines starting with '#' are comments, except for metadata lines of the
+form '# KEY: value' where KEY is an upper-case word (e.g. CHAINAGE).
+
+The parser is a generator over lines, so it never needs the whole file
+in memory and has no dependency on Tk or the drawing code.
+"""
+
+import re
+
+import road_timing
+from road_model import DEFAULT_CHAINAGE, Layer, Section
+from road_timing import stage
+
+STATION_PATTERN = re.compile(r'^\s*(\d+)\+(\d+(?:\.\d*)?)|^\s*(\d+(?:\.\d*)?)')
+
+class LoadCancelled(Exception):
+    """Raised inside a parse when its cancel event is set."""
+
+def _report_skipped(line_number, error):
+    print(f"[SKIPPING Line {line_number}]: {error}")
+
+def parse_metadata_line(line):
+    """Returns (key, value) for a '# KEY: value' line, or None."""
+    key, sep, value = line[1:].partition(':')
+    key = key.strip()
+    if not sep or not key.isupper() or not key.replace('_', '').isalpha():
+        return None
+    return key, value.strip()
+
+def parse_layer_line(line):
+    """Parses 'TYPE,color,x1,y1,...' into a Layer, or None if it is not a layer."""
+    parts = line.split(',')
+    if len(parts) < 8:
+        return None
+
+    return Layer(parts[0], parts[1], map(float, parts[2:]))
+
+def iter_road_records(lines, on_error=_report_skipped, cancel=None):
+    """
+    Yields ("meta", (key, value)) and ("layer", layer) records from an
+    iterable of .road lines (usually an open file), one line at a time.
+    Malformed lines are passed to on_error(line_number, exception) and skipped.
+    If cancel (a threading.Event) gets set, LoadCancelled is raised.
+    """
+    for line_number, line in enumerate(lines, 1):
+        if cancel is not None and cancel.is_set():
+            raise LoadCancelled()
+        try:
+            line = line.strip()
+            if not line: continue
+
+            if line.startswith('#'):
+                meta = parse_metadata_line(line)
+                if meta:
+                    yield "meta", meta
+                continue
+
+            layer = parse_layer_line(line)
+            if layer:
+                yield "layer", layer
+        except Exception as e:
+            on_error(line_number, e)
+
+def iter_road_file(filepath, on_error=_report_skipped, cancel=None):
+    """Streams the records of a .road file (see iter_road_records)."""
+    with open(filepath, 'r') as f:
+        yield from iter_road_records(f, on_error, cancel)
+
+def collect_section(records):
+    """Gathers a stream of records into a Section."""
+    section = Section()
+
+    for kind, payload in records:
+        if kind == "layer":
+            section.layers.append(payload)
+        elif payload[0] == "CHAINAGE":
+            section.chainage = payload[1]
+
+    return section
+
+def format_road_section(section):
+    """Writes a Section back out as .road text."""
+    # A section read without a CHAINAGE line is written without one
+    lines = [] if section.chainage == DEFAULT_CHAINAGE else [f"# CHAINAGE: {section.chainage}"]
+    for layer in section.layers:
+        coords = ",".join(map(repr, layer.data))
+        lines.append(f"{layer.type},{layer.color},{coords}")
+    return "\n".join(lines) + "\n"
+
+def collect_section_timed(records):
+    """collect_section() as the "parse" stage of a timed load (see road_timing)."""
+    with stage("parse") as s:
+        section = collect_section(records)
+        s.add(sum(len(layer) for layer in section.layers))
+    return section
+
+def read_road_section(filepath, cancel=None):
+    """Parses a .road file and returns a Section."""
+    if not road_timing.enabled:
+        return collect_section(iter_road_file(filepath, cancel=cancel))
+    # Timed loads read the whole file first, so disk and parsing are told apart
+    with stage("read") as s:
+        with open(filepath, 'r') as f:
+            text = f.read()
+        s.add(len(text))
+    return collect_section_timed(iter_road_records(text.splitlines(), cancel=cancel))
+
+def parse_road_bytes(data, cancel=None):
+    """Parses the raw bytes of a .road file (already read, e.g. to hash them) into a Section."""
+    return collect_section_timed(iter_road_records(data.decode().splitlines(), cancel=cancel))
+
+def read_chainage(filepath):
+    """Returns a .road file's chainage label, reading only as far as the CHAINAGE line."""
+    for kind, payload in iter_road_file(filepath):
+        if kind == "meta" and payload[0] == "CHAINAGE":
+            return payload[1]
+    return DEFAULT_CHAINAGE
+
+def parse_station(chainage):
+    """
+    Converts a chainage label to metres along the corridor:
+    '45+200.00 (Cut Section)' -> 45200.0, '1250.5' -> 1250.5.
+    Returns None if the label does not start with a station.
+    """
+    match = STATION_PATTERN.match(chainage)
+    if not match:
+        return None
+    km, metres, plain = match.groups()
+    if plain is not None:
+        return float(plain)
+    return int(km) * 1000 + float(metres)
@@ -0,0 +1,264 @@
+"""
+Streaming multi-page PDF output for corridor sheets.
+
+PdfDocument writes a PDF one object at a time: the shared resources
+(two standard fonts and one stipple pattern per Tk stipple) go out
+first, then each page as it is drawn, its content stream deflated
+straight to disk, and finally the page tree, catalogue and xref. Only
+the byte offsets of the objects are kept, so a corridor of any length
+makes one file in constant memory.
+
+A page is a stand-in for tk.Canvas (like road_svg.SvgCanvas), in the
+same top-down pixel coordinates, with begin_group() / end_group() to
+place each section in its cell of the sheet. The stipple patterns are
+uncoloured, so one pattern per stipple serves every fill colour.
+"""
+import math
+import os
+import zlib
+
+from road_colors import color_to_rgb
+from road_svg import ARROW_HALF_WIDTH, ARROW_LENGTH, STIPPLES, flatten_coords
+
+A3_LANDSCAPE = (1190.55, 841.89)   # points
+
+# Advance widths of Helvetica (per 1000 units) for ' ' .. '~'; used to place anchored text
+HELVETICA_WIDTHS = [
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+]
+BOLD_WIDTH_FACTOR = 1.06  # Helvetica-Bold is a little wider
+
+# anchor: (fraction of the width left of x, vertical position of the text block)
+TK_ANCHORS = {
+    "n": (0.5, "top"), "s": (0.5, "bottom"), "center": (0.5, "middle"),
+    "e": (1.0, "middle"), "w": (0.0, "middle"),
+    "ne": (1.0, "top"), "nw": (0.0, "top"),
+    "se": (1.0, "bottom"), "sw": (0.0, "bottom"),
+}
+DEFAULT_FONT = ("Helvetica", 10)
+
+def text_width(text, size, bold=False):
+    units = sum(HELVETICA_WIDTHS[ord(c) - 32] if 32 <= ord(c) <= 126 else 556 for c in text)
+    return units * size / 1000 * (BOLD_WIDTH_FACTOR if bold else 1.0)
+
+def _pdf_string(text):
+    data = text.encode("cp1252", errors="replace")
+    return "(" + data.decode("latin-1").replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") + ")"
+
+def _rgb(color):
+    return " ".join(f"{c / 255:.3f}" for c in color_to_rgb(color))
+
+
+class PdfDocument:
+    """
+    Writes a PDF page by page; use new_page() for each page and close()
+    at the end. Leaving a with block on an exception calls abort() instead.
+    """
+
+    def __init__(self, filepath, page_size=A3_LANDSCAPE):
+        self.filepath = filepath
+        self.width, self.height = page_size
+        self.f = open(filepath, 'wb')
+        self.offsets = {}   # object number -> byte offset
+        self.next_id = 1
+        self.page_ids = []
+        self.catalog_id = self._allocate()
+        self.pages_id = self._allocate()
+        self.f.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        self.resources_id = self._write_resources()
+
+    def _allocate(self):
+        object_id = self.next_id
+        self.next_id += 1
+        return object_id
+
+    def _begin_object(self, object_id):
+        self.offsets[object_id] = self.f.tell()
+        self.f.write(f"{object_id} 0 obj\n".encode())
+
+    def _write_object(self, object_id, body):
+        self._begin_object(object_id)
+        self.f.write(body.encode("latin-1") + b"\nendobj\n")
+
+    def _write_resources(self):
+        fonts = {}
+        for name, base_font in (("F1", "Helvetica"), ("F2", "Helvetica-Bold")):
+            fonts[name] = self._allocate()
+            self._write_object(fonts[name], f"<< /Type /Font /Subtype /Type1 /BaseFont /{base_font} "
+                                            f"/Encoding /WinAnsiEncoding >>")
+        patterns = {}
+        for stipple, (size, pixels) in STIPPLES.items():
+            content = "".join(f"{x} {size - 1 - y} 1 1 re " for x, y in pixels) + "f"
+            patterns[stipple] = self._allocate()
+            self._begin_object(patterns[stipple])
+            self.f.write((f"<< /PatternType 1 /PaintType 2 /TilingType 1 /BBox [0 0 {size} {size}] "
+                          f"/XStep {size} /YStep {size} /Resources << >> /Length {len(content)} >>\n"
+                          f"stream\n{content}\nendstream\nendobj\n").encode())
+        resources_id = self._allocate()
+        font_dict = " ".join(f"/{name} {object_id} 0 R" for name, object_id in fonts.items())
+        pattern_dict = " ".join(f"/{name} {object_id} 0 R" for name, object_id in patterns.items())
+        self._write_object(resources_id, f"<< /Font << {font_dict} >> /Pattern << {pattern_dict} >> "
+                                         f"/ColorSpace << /Stipple [/Pattern /DeviceRGB] >> >>")
+        return resources_id
+
+    def new_page(self):
+        """Starts a page; draw on it, then call its finish()."""
+        return PdfPage(self)
+
+    def _start_stream(self):
+        stream_id, length_id = self._allocate(), self._allocate()
+        self._begin_object(stream_id)
+        self.f.write(f"<< /Length {length_id} 0 R /Filter /FlateDecode >>\nstream\n".encode())
+        return stream_id, length_id, self.f.tell()
+
+    def _end_stream(self, stream_id, length_id, start):
+        length = self.f.tell() - start
+        self.f.write(b"\nendstream\nendobj\n")
+        self._write_object(length_id, str(length))
+        page_id = self._allocate()
+        self._write_object(page_id, f"<< /Type /Page /Parent {self.pages_id} 0 R "
+                                    f"/MediaBox [0 0 {self.width:.2f} {self.height:.2f}] "
+                                    f"/Resources {self.resources_id} 0 R /Contents {stream_id} 0 R >>")
+        self.page_ids.append(page_id)
+
+    def close(self):
+        kids = " ".join(f"{page_id} 0 R" for page_id in self.page_ids)
+        self._write_object(self.pages_id, f"<< /Type /Pages /Kids [{kids}] /Count {len(self.page_ids)} >>")
+        self._write_object(self.catalog_id, f"<< /Type /Catalog /Pages {self.pages_id} 0 R >>")
+        xref_at = self.f.tell()
+        self.f.write(f"xref\n0 {self.next_id}\n0000000000 65535 f \n".encode())
+        for object_id in range(1, self.next_id):
+            self.f.write(f"{self.offsets[object_id]:010d} 00000 n \n".encode())
+        self.f.write(f"trailer\n<< /Size {self.next_id} /Root {self.catalog_id} 0 R >>\n"
+                     f"startxref\n{xref_at}\n%%EOF\n".encode())
+        self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def abort(self):
+        """Closes and deletes the unfinished file, whose xref could not be written."""
+        self.f.close()
+        try:
+            os.remove(self.filepath)
+        except OSError:
+            pass
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class PdfPage:
+    """One page of a PdfDocument, drawn through the tk.Canvas create_* interface."""
+
+    def __init__(self, document):
+        self.document = document
+        self.compressor = zlib.compressobj(6)
+        self.stream_id, self.length_id, self.start = document._start_stream()
+        # Top-down coordinates, like the canvas
+        self._emit(f"1 0 0 -1 0 {document.height:.2f} cm 1 j 1 J")
+
+    def _emit(self, operators):
+        self.document.f.write(self.compressor.compress((operators + "\n").encode("latin-1")))
+
+    def finish(self):
+        self.document.f.write(self.compressor.flush())
+        self.document._end_stream(self.stream_id, self.length_id, self.start)
+
+    @staticmethod
+    def _path(coords, close):
+        parts = [f"{coords[0]:.2f} {coords[1]:.2f} m"]
+        parts += [f"{coords[i]:.2f} {coords[i+1]:.2f} l" for i in range(2, len(coords) - 1, 2)]
+        if close:
+            parts.append("h")
+        return " ".join(parts)
+
+    def create_polygon(self, *coords, fill="black", outline="", width=1, stipple="", **options):
+        coords = flatten_coords(coords)
+        if len(coords) < 6:
+            return
+        path = self._path(coords, close=True)
+        if fill:
+            if stipple:
+                self._emit(f"/Stipple cs {_rgb(fill)} /{stipple if stipple in STIPPLES else 'gray25'} scn")
+            else:
+                self._emit(f"{_rgb(fill)} rg")
+            self._emit(path + " f*")
+        if outline:
+            self._emit(f"{_rgb(outline)} RG {width} w {path} S")
+
+    def create_line(self, *coords, fill="black", width=1, dash=None, arrow=None, **options):
+        coords = flatten_coords(coords)
+        if len(coords) < 4:
+            return
+        ops = f"{_rgb(fill)} RG {width} w "
+        if dash:
+            ops += f"[{' '.join(str(d) for d in dash)}] 0 d "
+        ops += self._path(coords, close=False) + " S"
+        if dash:
+            ops += " [] 0 d"
+        self._emit(ops)
+        if arrow in ("first", "both"):
+            self._arrowhead(coords[2], coords[3], coords[0], coords[1], fill)
+        if arrow in ("last", "both"):
+            self._arrowhead(coords[-4], coords[-3], coords[-2], coords[-1], fill)
+
+    def _arrowhead(self, x0, y0, x1, y1, color):
+        length = math.hypot(x1 - x0, y1 - y0)
+        if length == 0:
+            return
+        ux, uy = (x1 - x0) / length, (y1 - y0) / length
+        bx, by = x1 - ux * ARROW_LENGTH, y1 - uy * ARROW_LENGTH
+        self._emit(f"{_rgb(color)} rg " + self._path(
+            [x1, y1, bx - uy * ARROW_HALF_WIDTH, by + ux * ARROW_HALF_WIDTH,
+             bx + uy * ARROW_HALF_WIDTH, by - ux * ARROW_HALF_WIDTH], close=True) + " f")
+
+    def create_text(self, x, y, text="", anchor="center", fill="black", font=DEFAULT_FONT,
+                    angle=0, **options):
+        # Tk font sizes are points on a 96 dpi screen; the page is drawn in canvas pixels
+        size = abs(font[1]) * 4 / 3
+        bold = "bold" in font[2:]
+        lines = str(text).split("\n")
+        line_height = size * 1.2
+        across, vertical = TK_ANCHORS.get(anchor, TK_ANCHORS["center"])
+        if vertical == "top":
+            first = line_height * 0.8
+        elif vertical == "bottom":
+            first = -line_height * (len(lines) - 1) - line_height * 0.2
+        else:
+            first = -line_height * (len(lines) - 1) / 2 + line_height * 0.3
+
+        # Glyphs upright (and rotated counter-clockwise) in the flipped page
+        a = math.radians(angle)
+        cos_a, sin_a = math.cos(a), math.sin(a)
+        ops = [f"{_rgb(fill)} rg BT /{'F2' if bold else 'F1'} {size:.2f} Tf"]
+        for i, line in enumerate(lines):
+            dx = -across * text_width(line, size, bold)
+            dy = first + i * line_height
+            tx = x + dx * cos_a + dy * sin_a
+            ty = y - dx * sin_a + dy * cos_a
+            ops.append(f"{cos_a:.4f} {-sin_a:.4f} {-sin_a:.4f} {-cos_a:.4f} {tx:.2f} {ty:.2f} Tm "
+                       f"{_pdf_string(line)} Tj")
+        ops.append("ET")
+        self._emit(" ".join(ops))
+
+    def begin_group(self, x, y, scale=1.0, clip=None):
+        """Draws at page offset (x, y) and scale until end_group(), clipped to clip=(width, height)."""
+        ops = f"q {scale:.4f} 0 0 {scale:.4f} {x:.2f} {y:.2f} cm"
+        if clip is not None:
+            ops += f" 0 0 {clip[0]} {clip[1]} re W n"
+        self._emit(ops)
+
+    def end_group(self):
+        self._emit("Q")
+
+    def delete(self, *tags):
+        pass
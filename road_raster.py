@@ -0,0 +1,250 @@
+"""
+A dependency-free PNG renderer: another stand-in for tk.Canvas (like
+road_svg.SvgCanvas) that rasterises create_polygon / create_line calls
+into an RGB pixel buffer and writes it as a PNG with zlib.
+
+Polygons are filled scanline by scanline (even-odd rule, like X11) with
+SUBSAMPLES sub-scanlines per pixel row and exact horizontal coverage,
+which gives anti-aliased edges. Within a row, pixels between two span
+ends are all covered the same amount, so fully covered runs are filled
+with a single slice assignment and only the edge pixels are blended one
+by one. Stippled fills set the same pixels as Tk's stipple bitmaps.
+
+Hairlines are drawn with Xiaolin Wu's anti-aliased line algorithm and
+wider lines as filled quadrilaterals; dashes and arrowheads follow the
+Tk options. Text needs a font rasteriser, so create_text draws nothing.
+"""
+import math
+import struct
+import zlib
+
+from road_colors import color_to_rgb
+from road_svg import ARROW_HALF_WIDTH, ARROW_LENGTH, STIPPLES, flatten_coords
+
+SUBSAMPLES = 4
+SAMPLE_OFFSETS = [(i + 0.5) / SUBSAMPLES for i in range(SUBSAMPLES)]
+
+def _png_chunk(kind, data):
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+def _dash_segments(points, dash):
+    """Splits a polyline into its drawn dashes, the pattern running on across vertices."""
+    pattern = list(dash) if len(dash) % 2 == 0 else list(dash) * 2
+    index, left, on = 0, pattern[0], True
+    dashes, current = [], [points[0]]
+    for (x0, y0), (x1, y1) in zip(points, points[1:]):
+        length = math.hypot(x1 - x0, y1 - y0)
+        done = 0.0
+        while length - done > left:
+            done += left
+            t = done / length
+            point = (x0 + t * (x1 - x0), y0 + t * (y1 - y0))
+            if on:
+                current.append(point)
+                dashes.append(current)
+            current = [point]
+            on = not on
+            index = (index + 1) % len(pattern)
+            left = pattern[index]
+        left -= length - done
+        current.append((x1, y1))
+    if on and len(current) > 1:
+        dashes.append(current)
+    return dashes
+
+
+class PngCanvas:
+    """Rasterises canvas drawing calls into pixels and writes them as a PNG file."""
+
+    def __init__(self, width, height, bg="ivory"):
+        self.width = int(width)
+        self.height = int(height)
+        self.bg = bg
+        self.pixels = bytearray(bytes(color_to_rgb(bg)) * (self.width * self.height))
+
+    # --- Canvas interface ---
+
+    def create_polygon(self, *coords, fill="black", outline="", width=1, stipple="", **options):
+        coords = flatten_coords(coords)
+        points = list(zip(coords[0::2], coords[1::2]))
+        if len(points) < 3:
+            return
+        if fill:
+            self.fill_polygon(points, color_to_rgb(fill), STIPPLES.get(stipple) if stipple else None)
+        if outline:
+            self._stroke(points + [points[0]], color_to_rgb(outline), width)
+
+    def create_line(self, *coords, fill="black", width=1, dash=None, arrow=None, **options):
+        coords = flatten_coords(coords)
+        points = list(zip(coords[0::2], coords[1::2]))
+        if len(points) < 2:
+            return
+        color = color_to_rgb(fill)
+        for piece in (_dash_segments(points, dash) if dash else [points]):
+            self._stroke(piece, color, width)
+        if arrow in ("first", "both"):
+            self._arrowhead(points[1], points[0], color)
+        if arrow in ("last", "both"):
+            self._arrowhead(points[-2], points[-1], color)
+
+    def create_text(self, *coords, **options):
+        pass
+
+    def delete(self, *tags):
+        self.pixels[:] = bytes(color_to_rgb(self.bg)) * (self.width * self.height)
+
+    def write(self, filepath):
+        """Writes the pixels as an 8-bit RGB PNG."""
+        stride = self.width * 3
+        raw = bytearray()
+        for row in range(self.height):
+            raw.append(0)  # filter type: none
+            raw += self.pixels[row * stride:(row + 1) * stride]
+        with open(filepath, 'wb') as f:
+            f.write(b"\x89PNG\r\n\x1a\n")
+            f.write(_png_chunk(b"IHDR", struct.pack(">IIBBBBB", self.width, self.height, 8, 2, 0, 0, 0)))
+            f.write(_png_chunk(b"IDAT", zlib.compress(bytes(raw), 6)))
+            f.write(_png_chunk(b"IEND", b""))
+
+    # --- Polygons ---
+
+    def fill_polygon(self, points, color, stipple=None):
+        """Fills a polygon with anti-aliased edges; stipple is a (tile size, pixels) entry of STIPPLES."""
+        edges = []
+        for (x0, y0), (x1, y1) in zip(points, points[1:] + points[:1]):
+            if y0 == y1:
+                continue
+            if y0 > y1:
+                x0, y0, x1, y1 = x1, y1, x0, y0
+            edges.append((y0, y1, x0, (x1 - x0) / (y1 - y0)))
+        if not edges:
+            return
+        edges.sort()
+        first_row = max(int(edges[0][0]), 0)
+        last_row = min(int(math.ceil(max(e[1] for e in edges))), self.height)
+
+        active, next_edge = [], 0
+        for row in range(first_row, last_row):
+            sample_spans = []
+            for offset in SAMPLE_OFFSETS:
+                sy = row + offset
+                while next_edge < len(edges) and edges[next_edge][0] <= sy:
+                    active.append(edges[next_edge])
+                    next_edge += 1
+                active = [e for e in active if e[1] > sy]
+                xs = sorted(x0 + (sy - y0) * slope for y0, y1, x0, slope in active if y0 <= sy)
+                spans = []
+                for i in range(0, len(xs) - 1, 2):
+                    x0, x1 = max(xs[i], 0.0), min(xs[i + 1], self.width)
+                    if x1 > x0:
+                        spans.append((x0, x1))
+                sample_spans.append(spans)
+            self._fill_row(row, sample_spans, color, stipple)
+
+    def _fill_row(self, row, sample_spans, color, stipple):
+        breaks = set()
+        for spans in sample_spans:
+            for x0, x1 in spans:
+                breaks.update((int(x0), int(x0) + 1, int(x1), int(x1) + 1))
+        breaks = sorted(b for b in breaks if 0 <= b <= self.width)
+
+        # Sweep the runs left to right, keeping a place in each sample's spans
+        places = [0] * len(sample_spans)
+        for a, b in zip(breaks, breaks[1:]):
+            # A pixel holding a span end is a run of its own, so every
+            # pixel of a longer run is covered the same as its first
+            right = a + 1
+            covered = 0.0
+            for k, spans in enumerate(sample_spans):
+                i = places[k]
+                while i < len(spans) and spans[i][1] <= a:
+                    i += 1
+                places[k] = i
+                while i < len(spans) and spans[i][0] < right:
+                    x0, x1 = spans[i]
+                    covered += min(x1, right) - max(x0, a)
+                    i += 1
+            self._blend(row, a, b, color, covered / SUBSAMPLES, stipple)
+
+    def _blend(self, row, start, stop, color, alpha, stipple):
+        """Paints pixels start..stop-1 of a row with color at the given coverage."""
+        if alpha <= 0.0 or start >= stop:
+            return
+        pixels = self.pixels
+        base = row * self.width * 3
+        if stipple is not None:
+            size, bits = stipple
+            columns = [x for x, y in bits if y == row % size]
+            for column in columns:
+                first = start + (column - start) % size
+                if alpha >= 0.999:
+                    count = len(range(first, stop, size))
+                    for channel in range(3):
+                        pixels[base + first * 3 + channel:base + stop * 3:size * 3] = bytes((color[channel],)) * count
+                else:
+                    for x in range(first, stop, size):
+                        self._blend_pixel(base + x * 3, color, alpha)
+            return
+        if alpha >= 0.999:
+            pixels[base + start * 3:base + stop * 3] = bytes(color) * (stop - start)
+        else:
+            for x in range(start, stop):
+                self._blend_pixel(base + x * 3, color, alpha)
+
+    def _blend_pixel(self, i, color, alpha):
+        pixels = self.pixels
+        keep = 1.0 - alpha
+        pixels[i] = int(pixels[i] * keep + color[0] * alpha + 0.5)
+        pixels[i + 1] = int(pixels[i + 1] * keep + color[1] * alpha + 0.5)
+        pixels[i + 2] = int(pixels[i + 2] * keep + color[2] * alpha + 0.5)
+
+    # --- Lines ---
+
+    def _stroke(self, points, color, width):
+        for (x0, y0), (x1, y1) in zip(points, points[1:]):
+            if width <= 1.5:
+                self._hairline(x0, y0, x1, y1, color, min(width, 1.0))
+                continue
+            length = math.hypot(x1 - x0, y1 - y0)
+            if length == 0:
+                continue
+            nx, ny = -(y1 - y0) / length * width / 2, (x1 - x0) / length * width / 2
+            self.fill_polygon([(x0 + nx, y0 + ny), (x1 + nx, y1 + ny),
+                               (x1 - nx, y1 - ny), (x0 - nx, y0 - ny)], color)
+
+    def _plot(self, x, y, color, alpha):
+        if 0 <= x < self.width and 0 <= y < self.height and alpha > 0:
+            self._blend_pixel((y * self.width + x) * 3, color, min(alpha, 1.0))
+
+    def _hairline(self, x0, y0, x1, y1, color, strength=1.0):
+        """Xiaolin Wu's anti-aliased line, clipped to the canvas pixel by pixel."""
+        steep = abs(y1 - y0) > abs(x1 - x0)
+        if steep:
+            x0, y0, x1, y1 = y0, x0, y1, x1
+        if x0 > x1:
+            x0, y0, x1, y1 = x1, y1, x0, y0
+        dx = x1 - x0
+        gradient = (y1 - y0) / dx if dx else 1.0
+        limit = self.height if steep else self.width
+        start, stop = max(int(round(x0)), 0), min(int(round(x1)), limit - 1)
+        y = y0 + gradient * (start - x0)
+        for x in range(start, stop + 1):
+            below = math.floor(y)
+            frac = y - below
+            if steep:
+                self._plot(below, x, color, (1 - frac) * strength)
+                self._plot(below + 1, x, color, frac * strength)
+            else:
+                self._plot(x, below, color, (1 - frac) * strength)
+                self._plot(x, below + 1, color, frac * strength)
+            y += gradient
+
+    def _arrowhead(self, tail, tip, color):
+        (x0, y0), (x1, y1) = tail, tip
+        length = math.hypot(x1 - x0, y1 - y0)
+        if length == 0:
+            return
+        ux, uy = (x1 - x0) / length, (y1 - y0) / length
+        bx, by = x1 - ux * ARROW_LENGTH, y1 - uy * ARROW_LENGTH
+        self.fill_polygon([(x1, y1), (bx - uy * ARROW_HALF_WIDTH, by + ux * ARROW_HALF_WIDTH),
+                           (bx + uy * ARROW_HALF_WIDTH, by - ux * ARROW_HALF_WIDTH)], color)
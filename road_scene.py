@@ -0,0 +1,114 @@
+"""
+Retained-mode drawing on a tk.Canvas.
+
+A Scene stands in front of the canvas with the same create_* calls, but
+remembers which canvas item it made for each drawn thing. Drawing the
+next section (between begin() and end()) then moves and restyles the
+existing items with canvas.coords() / itemconfigure() instead of
+deleting everything and creating it again; only items the new section
+does not have are deleted, and only new ones are created.
+
+An item's identity is its kind, its tags and how many items with that
+kind and tags came before it in the frame, so e.g. the second
+"layer:BASE" polygon of one section is updated in place to become the
+second "layer:BASE" polygon of the next. If the frame's drawing order
+no longer matches the stacking order on the canvas (say, a section with
+an extra layer), the items are restacked once at the end of the frame.
+"""
+from road_svg import flatten_coords
+
+
+class Scene:
+    """Diff-based redraw of canvas items between frames."""
+
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.items = {}      # identity -> [item id, coords, options]
+        self.stack = []      # our item ids, bottom to top, as they are on the canvas
+        self.visited = set()
+        self.ordinals = {}
+        self.frame_order = []
+        self.created = self.updated = self.deleted = 0
+
+    def begin(self):
+        """Starts a new frame."""
+        self.visited = set()
+        self.ordinals = {}
+        self.frame_order = []
+        self.created = self.updated = self.deleted = 0
+
+    def end(self):
+        """Finishes a frame, deleting the items it did not draw and fixing the stacking order."""
+        stale = set()
+        for identity in [i for i in self.items if i not in self.visited]:
+            item_id = self.items.pop(identity)[0]
+            self.canvas.delete(item_id)
+            stale.add(item_id)
+            self.deleted += 1
+        if stale:
+            self.stack = [item_id for item_id in self.stack if item_id not in stale]
+
+        if self.stack != self.frame_order:
+            for item_id in self.frame_order:
+                self.canvas.tag_raise(item_id)
+            self.stack = list(self.frame_order)
+
+    def show(self, display):
+        """Draws a DisplayList (see road_display) as one frame."""
+        self.begin()
+        display.replay(self)
+        self.end()
+
+    def invalidate(self):
+        """
+        Forgets the coordinates of our items, after they were moved behind
+        our back (e.g. canvas.scale / canvas.move), so the next frame sets
+        them all again.
+        """
+        for item in self.items.values():
+            item[1] = None
+
+    def _draw(self, kind, coords, options):
+        coords = flatten_coords(coords)
+        tags = options.get("tags", ())
+        base = (kind, tags if isinstance(tags, str) else tuple(tags))
+        ordinal = self.ordinals.get(base, 0)
+        self.ordinals[base] = ordinal + 1
+        identity = base + (ordinal,)
+        self.visited.add(identity)
+
+        item = self.items.get(identity)
+        if item is not None and not set(item[2]) <= set(options):
+            # An option went away; Tk has no "unset", so start the item afresh
+            self.canvas.delete(item[0])
+            self.stack.remove(item[0])
+            item = None
+        if item is None:
+            item_id = getattr(self.canvas, kind)(coords, **options)
+            self.items[identity] = [item_id, coords, dict(options)]
+            self.stack.append(item_id)
+            self.frame_order.append(item_id)
+            self.created += 1
+            return item_id
+
+        item_id, old_coords, old_options = item
+        self.frame_order.append(item_id)
+        if coords != old_coords:
+            self.canvas.coords(item_id, coords)
+            item[1] = coords
+        changed = {k: v for k, v in options.items() if old_options.get(k) != v}
+        if changed:
+            self.canvas.itemconfigure(item_id, **changed)
+            old_options.update(changed)
+        if coords != old_coords or changed:
+            self.updated += 1
+        return item_id
+
+    def create_line(self, *coords, **options):
+        return self._draw("create_line", coords, options)
+
+    def create_polygon(self, *coords, **options):
+        return self._draw("create_polygon", coords, options)
+
+    def create_text(self, *coords, **options):
+        return self._draw("create_text", coords, options)
@@ -0,0 +1,210 @@
+"""
+A stand-in for tk.Canvas that turns create_line / create_polygon /
+create_text calls into SVG elements, so the drawing code in
+road_drawing.py can render sections without a Tk root.
+
+Opened on a file (SvgCanvas.open), every element is written out as soon
+as it is drawn, point lists included, so neither a huge section nor a
+sheet of many sections is ever held in memory as a document. Without a
+file the elements are collected and written at the end by write().
+
+Tk stipples become small repeating <pattern>s of the fill colour, made
+the first time each stipple and colour is used. Groups (begin_group)
+place a drawing at an offset and scale on the page, clipped to its frame,
+for multi-section sheets.
+"""
+from xml.sax.saxutils import escape
+
+from road_colors import color_to_hex
+
+TK_ANCHORS = {
+    # anchor: (text-anchor, vertical position of the text block)
+    "n": ("middle", "top"), "s": ("middle", "bottom"), "center": ("middle", "middle"),
+    "e": ("end", "middle"), "w": ("start", "middle"),
+    "ne": ("end", "top"), "nw": ("start", "top"),
+    "se": ("end", "bottom"), "sw": ("start", "bottom"),
+}
+
+DEFAULT_FONT = ("Helvetica", 10)
+
+# Tk's stipple bitmaps as (tile size, set pixels)
+STIPPLES = {
+    "gray12": (4, ((0, 0), (2, 2))),
+    "gray25": (2, ((0, 0),)),
+    "gray50": (2, ((0, 0), (1, 1))),
+    "gray75": (2, ((0, 0), (1, 0), (1, 1))),
+}
+
+POINTS_PER_WRITE = 1024
+
+# Arrowheads of every stand-in canvas, in pixels from the tip
+ARROW_LENGTH = 8
+ARROW_HALF_WIDTH = 4
+
+ARROW_DEFS = ('<defs>'
+              f'<marker id="arrow-end" markerWidth="{ARROW_LENGTH}" markerHeight="{2 * ARROW_HALF_WIDTH}" '
+              f'refX="{ARROW_LENGTH}" refY="{ARROW_HALF_WIDTH}" orient="auto">'
+              f'<path d="M0,0 L{ARROW_LENGTH},{ARROW_HALF_WIDTH} L0,{2 * ARROW_HALF_WIDTH} z" '
+              'fill="context-stroke"/></marker>'
+              f'<marker id="arrow-start" markerWidth="{ARROW_LENGTH}" markerHeight="{2 * ARROW_HALF_WIDTH}" '
+              f'refX="0" refY="{ARROW_HALF_WIDTH}" orient="auto">'
+              f'<path d="M{ARROW_LENGTH},0 L0,{ARROW_HALF_WIDTH} L{ARROW_LENGTH},{2 * ARROW_HALF_WIDTH} z" '
+              'fill="context-stroke"/></marker>'
+              '</defs>\n')
+
+def flatten_coords(coords):
+    """Accepts canvas coords either as varargs or as a single sequence."""
+    if len(coords) == 1 and not isinstance(coords[0], (int, float)):
+        coords = coords[0]
+    return [float(c) for c in coords]
+
+def _points(coords):
+    """The "x,y x,y ..." text of a point list, in pieces of POINTS_PER_WRITE points."""
+    step = 2 * POINTS_PER_WRITE
+    for start in range(0, len(coords) - 1, step):
+        chunk = coords[start:start + step]
+        text = " ".join(f"{chunk[i]:.2f},{chunk[i+1]:.2f}" for i in range(0, len(chunk) - 1, 2))
+        yield text if start == 0 else " " + text
+
+def _font_attrs(font):
+    family, size = font[0], font[1]
+    attrs = f'font-family="{escape(family)}" font-size="{abs(size) * 4 / 3:.1f}"'
+    if "bold" in font[2:]:
+        attrs += ' font-weight="bold"'
+    return attrs
+
+
+class SvgCanvas:
+    """Turns canvas drawing calls into SVG, streamed to a file or collected for write()."""
+
+    def __init__(self, width, height, bg="ivory", stream=None):
+        self.width = width
+        self.height = height
+        self.bg = bg
+        self.stream = stream
+        self.elements = []
+        self.patterns = set()
+        self.clip_ids = {}
+        if stream is not None:
+            self._write_header(stream.write)
+
+    @classmethod
+    def open(cls, filepath, width, height, bg="ivory"):
+        """An SvgCanvas that streams into filepath; close it (or use 'with') to finish the file."""
+        return cls(width, height, bg, stream=open(filepath, 'w', encoding='utf-8'))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _write_header(self, write):
+        write(f'<svg xmlns="http://www.w3.org/2000/svg" width="{self.width}" '
+              f'height="{self.height}" viewBox="0 0 {self.width} {self.height}">\n')
+        write(ARROW_DEFS)
+        write(f'<rect width="100%" height="100%" fill="{color_to_hex(self.bg)}"/>\n')
+
+    def _emit(self, *parts):
+        """Writes one element, given as pieces of text, or keeps it for write()."""
+        if self.stream is not None:
+            for part in parts:
+                self.stream.write(part)
+            self.stream.write("\n")
+        else:
+            self.elements.append("".join(parts))
+
+    def _stipple_fill(self, stipple, color):
+        """The url() of a pattern drawing color in the stipple's pixels, defining it on first use."""
+        size, pixels = STIPPLES.get(stipple, STIPPLES["gray25"])
+        pattern_id = f"stipple-{stipple}-{color[1:]}"
+        if pattern_id not in self.patterns:
+            self.patterns.add(pattern_id)
+            rects = "".join(f'<rect x="{x}" y="{y}" width="1" height="1" fill="{color}"/>' for x, y in pixels)
+            self._emit(f'<defs><pattern id="{pattern_id}" width="{size}" height="{size}" '
+                       f'patternUnits="userSpaceOnUse">{rects}</pattern></defs>')
+        return f"url(#{pattern_id})"
+
+    def create_line(self, *coords, fill="black", width=1, dash=None, arrow=None, **options):
+        coords = flatten_coords(coords)
+        attrs = f'stroke="{color_to_hex(fill)}" stroke-width="{width}" fill="none"'
+        if dash:
+            attrs += f' stroke-dasharray="{" ".join(str(d) for d in dash)}"'
+        if arrow in ("first", "both"):
+            attrs += ' marker-start="url(#arrow-start)"'
+        if arrow in ("last", "both"):
+            attrs += ' marker-end="url(#arrow-end)"'
+        self._emit('<polyline points="', *_points(coords), f'" {attrs}/>')
+
+    def create_polygon(self, *coords, fill="black", outline="", width=1, stipple="", **options):
+        coords = flatten_coords(coords)
+        if not fill:
+            attrs = 'fill="none"'
+        elif stipple:
+            attrs = f'fill="{self._stipple_fill(stipple, color_to_hex(fill))}"'
+        else:
+            attrs = f'fill="{color_to_hex(fill)}"'
+        if outline:
+            attrs += f' stroke="{color_to_hex(outline)}" stroke-width="{width}"'
+        self._emit('<polygon points="', *_points(coords), f'" {attrs}/>')
+
+    def create_text(self, x, y, text="", anchor="center", fill="black", font=DEFAULT_FONT,
+                    angle=0, **options):
+        text_anchor, vertical = TK_ANCHORS.get(anchor, TK_ANCHORS["center"])
+        lines = str(text).split("\n")
+        line_height = abs(font[1]) * 4 / 3 * 1.2
+        if vertical == "top":
+            first_y = y + line_height * 0.8
+        elif vertical == "bottom":
+            first_y = y - line_height * (len(lines) - 1) - line_height * 0.2
+        else:
+            first_y = y - line_height * (len(lines) - 1) / 2 + line_height * 0.3
+
+        attrs = f'fill="{color_to_hex(fill)}" text-anchor="{text_anchor}" {_font_attrs(font)}'
+        if angle:
+            # Tk angles are counter-clockwise, SVG rotations clockwise
+            attrs += f' transform="rotate({-angle:.2f} {x:.2f} {y:.2f})"'
+        spans = "".join(
+            f'<tspan x="{x:.2f}" y="{first_y + i * line_height:.2f}">{escape(line)}</tspan>'
+            for i, line in enumerate(lines))
+        self._emit(f'<text {attrs}>{spans}</text>')
+
+    def begin_group(self, x, y, scale=1.0, clip=None):
+        """
+        Starts drawing at page offset (x, y) and scale; clip=(width, height)
+        hides anything outside that frame of the group's own coordinates.
+        """
+        attrs = f'transform="translate({x:.2f} {y:.2f}) scale({scale:.4f})"'
+        if clip is not None:
+            clip_id = self.clip_ids.get(clip)
+            if clip_id is None:
+                clip_id = self.clip_ids[clip] = f"clip-{len(self.clip_ids)}"
+                self._emit(f'<defs><clipPath id="{clip_id}"><rect width="{clip[0]}" '
+                           f'height="{clip[1]}"/></clipPath></defs>')
+            attrs += f' clip-path="url(#{clip_id})"'
+        self._emit(f'<g {attrs}>')
+
+    def end_group(self):
+        self._emit('</g>')
+
+    def delete(self, *tags):
+        """Forgets the collected drawing (a streamed file cannot be taken back)."""
+        if self.stream is None:
+            self.elements = []
+            self.patterns = set()
+            self.clip_ids = {}
+
+    def close(self):
+        """Finishes a streamed file."""
+        if self.stream is not None:
+            self.stream.write('</svg>\n')
+            self.stream.close()
+            self.stream = None
+
+    def write(self, filepath):
+        """Writes the collected drawing to an SVG file."""
+        with open(filepath, 'w', encoding='utf-8') as f:
+            self._write_header(f.write)
+            for element in self.elements:
+                f.write(element + "\n")
+            f.write('</svg>\n')
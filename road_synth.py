@@ -0,0 +1,142 @@
+"""
+Synthetic .road sections and corridors for benchmarks and stress tests.
+
+A section has a TERRAIN polygon with a chosen number of ground points,
+a simple or divided carriageway from road_template.py, whose side
+slopes run out to their catch points on the ground, and optionally
+extra layers with a chosen number of vertices each. Cut sections sit
+below the ground, fill sections above it. Corridors run the same
+ground line along the stations with a slow drift, so cut and fill
+alternate the way they would on a real alignment.
+
+    python road_synth.py section big.road --terrain-points 200000 --layout divided
+    python road_synth.py corridor synth.roads --sections 5000 --spacing 20
+    python road_synth.py corridor synth/ --sections 100 --earthwork fill
+"""
+import argparse
+import math
+import os
+import random
+import sys
+
+from road_analysis import DIVIDED, SIMPLE
+from road_container import RoadContainerWriter
+from road_geometry import interpolate_sorted
+from road_model import Layer
+from road_parser import format_road_section
+from road_template import TEMPLATES, SideSlopes
+
+CUT = "cut"
+FILL = "fill"
+MIXED = "mixed"   # corridors only: follows the drifting ground
+
+HALF_WIDTH = 60.0        # terrain extends this far either side of the centreline
+SIDE_SLOPE = 2.0         # 1 : SIDE_SLOPE
+ROAD_DEPTH = 3.0         # formation this far below (cut) or above (fill) the ground
+
+
+def format_station(station):
+    """45200.0 -> '45+200.00'."""
+    km, metres = divmod(station, 1000.0)
+    return f"{int(km)}+{metres:06.2f}"
+
+def _ground(rng, points, drift=0.0):
+    """A rolling ground line of points (x, y) from -HALF_WIDTH to HALF_WIDTH."""
+    phase = rng.uniform(0, 2 * math.pi)
+    xs = [-HALF_WIDTH + 2 * HALF_WIDTH * i / (points - 1) for i in range(points)]
+    ys = [drift + 1.5 * math.sin(x / 9 + phase) + 0.4 * math.sin(x / 2.3) + rng.gauss(0, 0.02)
+          for x in xs]
+    return xs, ys
+
+def _ring(cx, cy, radius, points):
+    coords = []
+    for i in range(points):
+        a = 2 * math.pi * i / points
+        coords += [cx + radius * math.cos(a), cy + radius * math.sin(a)]
+    return coords
+
+def synth_section(station=0.0, layout=SIMPLE, earthwork=CUT, terrain_points=7,
+                  extra_layers=0, layer_points=16, drift=0.0, seed=None):
+    """Builds one synthetic Section (see the module docstring)."""
+    rng = random.Random(seed if seed is not None else station)
+    xs, ys = _ground(rng, max(terrain_points, 2), drift)
+    cut = earthwork == CUT
+    ground_low = min(ys) - 6.0
+
+    terrain = [c for point in zip(xs, ys) for c in point] + [HALF_WIDTH, ground_low, -HALF_WIDTH, ground_low]
+
+    centre = interpolate_sorted(xs, ys, [0.0])[0]
+    road = centre - ROAD_DEPTH if cut else centre + ROAD_DEPTH
+    label = f"{format_station(station)} (Synthetic {layout.title()} - {earthwork.title()} Section)"
+    section = TEMPLATES[layout].build(label, Layer("TERRAIN", "green", terrain), road,
+                                      SideSlopes(SIDE_SLOPE, SIDE_SLOPE))
+    layers = section.layers
+
+    for k in range(extra_layers):
+        # Buried services: rings of the requested size below the formation
+        cx = -HALF_WIDTH + (k + 0.5) * 2 * HALF_WIDTH / extra_layers
+        layers.append(Layer(f"DUCT_{k}", "orange", _ring(cx, road - 2.5, 0.3, max(layer_points, 3))))
+
+    return section
+
+def synth_corridor(count, start_station=0.0, spacing=20.0, layout=SIMPLE, earthwork=MIXED,
+                   terrain_points=7, extra_layers=0, layer_points=16, seed=0):
+    """Yields count synthetic Sections spaced along a corridor."""
+    for i in range(count):
+        station = start_station + i * spacing
+        drift = 4.0 * math.sin(i / 37.0)
+        kind = earthwork if earthwork != MIXED else (CUT if drift > 0 else FILL)
+        yield synth_section(station, layout, kind, terrain_points, extra_layers,
+                            layer_points, drift, seed=seed * 1000003 + i)
+
+def write_section(filepath, section):
+    with open(filepath, 'w') as f:
+        f.write(format_road_section(section))
+
+def write_corridor(out_path, sections):
+    """
+    Writes sections into a .roads container, or as numbered .road files
+    if out_path is a directory (or does not end in .roads). Returns the count.
+    """
+    if out_path.endswith(".roads"):
+        with RoadContainerWriter(out_path) as writer:
+            for section in sections:
+                writer.add_section(section)
+            return len(writer.entries)
+    os.makedirs(out_path, exist_ok=True)
+    count = 0
+    for count, section in enumerate(sections, 1):
+        write_section(os.path.join(out_path, f"section_{count:05d}.road"), section)
+    return count
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic .road sections and corridors.")
+    parser.add_argument("what", choices=("section", "corridor"))
+    parser.add_argument("output", help=".road file, .roads container or directory")
+    parser.add_argument("--layout", choices=(SIMPLE, DIVIDED), default=SIMPLE)
+    parser.add_argument("--earthwork", choices=(CUT, FILL, MIXED), default=None,
+                        help="default: cut for a section, mixed for a corridor")
+    parser.add_argument("--terrain-points", type=int, default=7)
+    parser.add_argument("--extra-layers", type=int, default=0)
+    parser.add_argument("--layer-points", type=int, default=16, help="vertices per extra layer")
+    parser.add_argument("--sections", type=int, default=100)
+    parser.add_argument("--start", type=float, default=0.0, help="first station in metres")
+    parser.add_argument("--spacing", type=float, default=20.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.what == "section":
+        section = synth_section(args.start, args.layout, args.earthwork or CUT, args.terrain_points,
+                                args.extra_layers, args.layer_points, seed=args.seed)
+        write_section(args.output, section)
+        print(f"Wrote {section} to {args.output}")
+    else:
+        sections = synth_corridor(args.sections, args.start, args.spacing, args.layout,
+                                  args.earthwork or MIXED, args.terrain_points,
+                                  args.extra_layers, args.layer_points, args.seed)
+        count = write_corridor(args.output, sections)
+        print(f"Wrote {count} sections to {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,182 @@
+"""
+Catch points and template sections.
+
+A side slope runs from a formation edge out to where it meets the
+ground: up at 1:cut in cutting, where the ground at the edge is above
+the formation, and down at 1:fill on embankment. catch_point() finds
+that point on the TERRAIN surface with road_geometry.ray_crossing().
+
+A SectionTemplate is a carriageway drawn relative to its finished road
+level at the centreline. build() places it at a level on a TERRAIN
+layer and adds the SUBBASE from catch point to catch point, in the
+order road_analysis reads its side slopes from, so a section can be
+made from a ground line and a level instead of vertex by vertex.
+
+    python road_template.py ground.road designed.road --level 102.5
+    python road_template.py ground.roads designed.roads --layout divided --above-ground -3 --cut 1:1.5
+"""
+import argparse
+import sys
+
+from road_analysis import DIVIDED, SIMPLE
+from road_container import RoadContainer, RoadContainerWriter, load_section
+from road_geometry import interpolate_sorted, ray_crossing
+from road_model import Layer, Section
+from road_parser import format_road_section
+
+GROUND_LAYER = "TERRAIN"
+
+
+def parse_ratio(text):
+    """'1:1.5' (or just '1.5') -> 1.5, the horizontal run per unit of rise."""
+    parts = str(text).replace(" ", "").split(":")
+    try:
+        if len(parts) == 1:
+            ratio = float(parts[0])
+        elif len(parts) == 2:
+            ratio = float(parts[1]) / float(parts[0])
+        else:
+            raise ValueError
+    except (ValueError, ZeroDivisionError):
+        raise ValueError(f"Not a slope ratio like 1:2: {text!r}")
+    if ratio <= 0:
+        raise ValueError(f"Slope ratio must be positive: {text!r}")
+    return ratio
+
+
+class SideSlopes:
+    """Side-slope ratios 1:cut in cutting and 1:fill on embankment."""
+    __slots__ = ("cut", "fill")
+
+    def __init__(self, cut=1.5, fill=2.0):
+        self.cut = cut
+        self.fill = fill
+
+    def __repr__(self):
+        return f"SideSlopes(cut=1:{self.cut:g}, fill=1:{self.fill:g})"
+
+
+def catch_point(ground, edge, side, slopes):
+    """
+    Where the side slope from the formation edge (offset, elevation)
+    meets the ground (the (xs, ys) surface of TERRAIN), going left for
+    side -1 and right for side +1. Raises ValueError if it never does.
+    """
+    xs, ys = ground
+    x0, y0 = edge
+    if not xs or not xs[0] <= x0 <= xs[-1]:
+        raise ValueError(f"Formation edge at offset {x0:g} is outside the {GROUND_LAYER} layer")
+    ground_y = interpolate_sorted(xs, ys, [x0])[0]
+    if ground_y == y0:
+        return x0, y0
+    # Ground above the formation edge: cutting, so the slope climbs out to it
+    rise = 1.0 / slopes.cut if ground_y > y0 else -1.0 / slopes.fill
+    point = ray_crossing(xs, ys, x0, y0, rise, side)
+    if point is None:
+        raise ValueError(f"The {'left' if side < 0 else 'right'} side slope from offset {x0:g} "
+                         f"never meets the {GROUND_LAYER} layer")
+    return point
+
+def catch_points(terrain, left_edge, right_edge, slopes):
+    """(left, right) catch points of the formation edges on a TERRAIN Layer."""
+    ground = terrain.profile().surface()
+    return catch_point(ground, left_edge, -1, slopes), catch_point(ground, right_edge, 1, slopes)
+
+
+class SectionTemplate:
+    """
+    A carriageway relative to (0, finished road level): its layers as
+    (type, color, flat offsets), and the formation edges at +-edge,
+    depth below road level, where the side slopes start.
+    """
+    __slots__ = ("layout", "layers", "edge", "depth")
+
+    def __init__(self, layout, layers, edge, depth):
+        self.layout = layout
+        self.layers = layers
+        self.edge = edge
+        self.depth = depth
+
+    def build(self, chainage, terrain, level, slopes=None):
+        """A Section with this carriageway at road level on a TERRAIN Layer."""
+        slopes = slopes or SideSlopes()
+        formation = level - self.depth
+        left, right = catch_points(terrain, (-self.edge, formation), (self.edge, formation), slopes)
+        layers = [terrain, Layer("SUBBASE", "sandybrown",
+                                 [*left, -self.edge, formation, self.edge, formation, *right])]
+        for layer_type, color, offsets in self.layers:
+            layers.append(Layer(layer_type, color,
+                                [c + level if i % 2 else c for i, c in enumerate(offsets)]))
+        return Section(chainage, layers)
+
+
+TEMPLATES = {
+    SIMPLE: SectionTemplate(SIMPLE, [
+        ("BASE", "dimgray", [-5.5, -1.0, 5.5, -1.0, 5.5, -0.5, -5.5, -0.5]),
+        ("ASPHALT", "black", [-5, 0, 5, 0, 5, -0.5, -5, -0.5]),
+        ("SHOULDER", "darkgray", [5, 0, 6, -0.5, 5, -0.5]),
+        ("SHOULDER", "darkgray", [-5, 0, -6, -0.5, -5, -0.5]),
+    ], edge=7.0, depth=1.0),
+    DIVIDED: SectionTemplate(DIVIDED, [
+        ("BASE", "dimgray", [-12, -0.5, -2, -0.5, -2, -0.2, -12, -0.2]),
+        ("BASE", "dimgray", [2, -0.5, 12, -0.5, 12, -0.2, 2, -0.2]),
+        ("ASPHALT_L", "black", [-2, 0, -10, -0.16, -10, -0.36, -2, -0.2]),
+        ("ASPHALT_R", "black", [2, 0, 10, -0.16, 10, -0.36, 2, -0.2]),
+        ("MEDIAN", "gray", [-1.5, 1, -1, 0, 1, 0, 1.5, 1, 1, 0.5, -1, 0.5]),
+    ], edge=13.0, depth=0.5),
+}
+
+def design_section(section, template, slopes, level=None, above_ground=0.0):
+    """
+    Rebuilds a Section from its TERRAIN layer alone: the template at
+    level, or above_ground over the ground at the centreline.
+    """
+    terrain = section.find_layer(GROUND_LAYER)
+    if terrain is None:
+        raise ValueError(f"Section {section.chainage!r} has no {GROUND_LAYER} layer")
+    if level is None:
+        centre = terrain.profile().y_at(0.0)
+        if centre is None:
+            raise ValueError(f"Section {section.chainage!r}: {GROUND_LAYER} does not span the centreline")
+        level = centre + above_ground
+    return template.build(section.chainage, terrain, level, slopes)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build .road sections from TERRAIN and a carriageway template.")
+    parser.add_argument("input", help=".road file or .roads container with TERRAIN layers")
+    parser.add_argument("output", help=".road file or .roads container")
+    parser.add_argument("--layout", choices=sorted(TEMPLATES), default=SIMPLE)
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--level", type=float, default=None, help="finished road level at the centreline")
+    group.add_argument("--above-ground", type=float, default=0.0,
+                       help="road level relative to the ground at the centreline (negative: in cutting)")
+    parser.add_argument("--cut", default="1:1.5", help="side slope in cutting")
+    parser.add_argument("--fill", default="1:2", help="side slope on embankment")
+    args = parser.parse_args(argv)
+
+    try:
+        slopes = SideSlopes(parse_ratio(args.cut), parse_ratio(args.fill))
+    except ValueError as e:
+        parser.error(str(e))
+    template = TEMPLATES[args.layout]
+
+    try:
+        if args.input.endswith(".roads"):
+            with RoadContainer(args.input) as container, RoadContainerWriter(args.output) as writer:
+                for i in range(len(container)):
+                    writer.add_section(design_section(container.read_entry(i), template, slopes,
+                                                      args.level, args.above_ground))
+                count = len(writer.entries)
+        else:
+            section = design_section(load_section(args.input), template, slopes, args.level, args.above_ground)
+            with open(args.output, 'w') as f:
+                f.write(format_road_section(section))
+            count = 1
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    print(f"Wrote {count} sections to {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
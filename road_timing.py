@@ -0,0 +1,160 @@
+"""
+Optional per-stage timing of section loads and drawing.
+
+Turned on with the ROAD_TIMING environment variable (or the --timing
+flag of the GUI and batch tools):
+
+    ROAD_TIMING=1                 one JSON line per load on stderr
+    ROAD_TIMING=timings.jsonl     ... appended to that file instead
+
+A load is one Timings record, started with start() on whichever thread
+does the work and carried to the Tk thread for the drawing. Code along
+the way marks its stages with
+
+    with stage("parse") as s:
+        ...
+        s.add(vertex_count)
+
+which adds the wall time and an item count to the record running on
+that thread. When timing is off, stage() returns a shared do-nothing
+object, so the instrumentation costs one function call per stage.
+"""
+import json
+import os
+import sys
+import threading
+import time
+
+ENV_VAR = "ROAD_TIMING"
+
+enabled = False
+_log_path = None   # None: stderr
+_log_lock = threading.Lock()
+_local = threading.local()
+
+
+class Timings:
+    """Wall time and item counts per stage of one load."""
+    __slots__ = ("label", "kind", "started", "stages")
+
+    def __init__(self, label, kind="load"):
+        self.label = label
+        self.kind = kind
+        self.started = time.perf_counter()
+        self.stages = {}  # name -> [seconds, items], in first-seen order
+
+    def add(self, name, seconds, items=0):
+        entry = self.stages.setdefault(name, [0.0, 0])
+        entry[0] += seconds
+        entry[1] += items
+
+    def total(self):
+        return time.perf_counter() - self.started
+
+    def summary(self):
+        """Short text for a status bar, e.g. 'read 1.2ms  parse 8.0ms (4000)'."""
+        parts = []
+        for name, (seconds, items) in self.stages.items():
+            text = f"{name} {seconds * 1000:.1f}ms"
+            if items:
+                text += f" ({items})"
+            parts.append(text)
+        return "  ".join(parts)
+
+    def as_dict(self):
+        return {
+            "label": self.label,
+            "kind": self.kind,
+            "pid": os.getpid(),
+            "total_ms": round(self.total() * 1000, 3),
+            "stages": {name: {"ms": round(seconds * 1000, 3), "items": items}
+                       for name, (seconds, items) in self.stages.items()},
+        }
+
+
+class _Stage:
+    __slots__ = ("record", "name", "items", "t0")
+
+    def __init__(self, record, name):
+        self.record = record
+        self.name = name
+        self.items = 0
+
+    def add(self, items):
+        self.items += items
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.record.add(self.name, time.perf_counter() - self.t0, self.items)
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def add(self, items):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+NULL_STAGE = _NullStage()
+
+
+def configure(setting=None):
+    """
+    Turns timing on or off from a setting like the environment variable's
+    (read from the environment when None): empty or '0' is off, '1' logs
+    to stderr, anything else is a log file path.
+    """
+    global enabled, _log_path
+    if setting is None:
+        setting = os.environ.get(ENV_VAR, "")
+    enabled = setting not in ("", "0")
+    _log_path = None if setting in ("", "0", "1") else setting
+
+def stage(name):
+    """Times a stage of the load running on this thread (see the module docstring)."""
+    if not enabled:
+        return NULL_STAGE
+    record = getattr(_local, "record", None)
+    if record is None:
+        return NULL_STAGE
+    return _Stage(record, name)
+
+def start(label, kind="load"):
+    """Starts a Timings record on this thread; returns None when timing is off."""
+    if not enabled:
+        return None
+    record = Timings(label, kind)
+    _local.record = record
+    return record
+
+def current():
+    """The record this thread's stages go to, or None."""
+    return getattr(_local, "record", None) if enabled else None
+
+def activate(record):
+    """Makes record (possibly None) the one this thread's stages go to, e.g. on the Tk thread."""
+    _local.record = record
+
+def finish(record):
+    """Detaches record from this thread and writes it to the log."""
+    if record is None:
+        return
+    if getattr(_local, "record", None) is record:
+        _local.record = None
+    line = json.dumps(record.as_dict())
+    with _log_lock:
+        if _log_path is None:
+            print(line, file=sys.stderr)
+        else:
+            with open(_log_path, 'a') as f:
+                f.write(line + "\n")
+
+configure()
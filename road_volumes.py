@@ -0,0 +1,174 @@
+"""
+Corridor earthwork volumes between consecutive chainages.
+
+Sections are streamed in station order and only the neighbours needed
+by the formula are kept in memory:
+
+    average end area   V = L * (A1 + A2) / 2
+    prismoidal         V = (h1 + h2) / 6 * [(2 - h2/h1) A1
+                             + (h1 + h2)^2 / (h1 h2) A2 + (2 - h1/h2) A3]
+
+The prismoidal formula is Simpson's rule over a pair of intervals, in
+its general form for unequal spacing. Each pair of intervals becomes one
+row. When the number of intervals is odd, the last one falls back to
+average end area.
+
+The mass ordinate is the running total of cut minus fill. Long
+corridors are split into chunks that are computed in parallel, then
+stitched back together in order.
+
+    python road_volumes.py corridor.roads --method prismoidal --jobs 8 > volumes.csv
+"""
+import argparse
+import csv
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from road_container import collect_road_files, corridor_index, load_section
+from road_earthwork import section_areas
+
+AVERAGE_END_AREA = "average"
+PRISMOIDAL = "prismoidal"
+
+
+class VolumeRow:
+    """Cut, fill and material volumes (m^3) between two stations, plus the mass ordinate."""
+    __slots__ = ("start_station", "end_station", "cut", "fill", "materials", "mass")
+
+    def __init__(self, start_station, end_station, cut, fill, materials, mass=0.0):
+        self.start_station = start_station
+        self.end_station = end_station
+        self.cut = cut
+        self.fill = fill
+        self.materials = materials
+        self.mass = mass
+
+    def __repr__(self):
+        return (f"VolumeRow({self.start_station:.2f}-{self.end_station:.2f}, "
+                f"cut={self.cut:.2f}, fill={self.fill:.2f}, mass={self.mass:.2f})")
+
+
+def _combine(weights, area_sets):
+    """Applies the same weights to the cut, fill and material areas of several sections."""
+    cut = sum(w * a.cut for w, a in zip(weights, area_sets))
+    fill = sum(w * a.fill for w, a in zip(weights, area_sets))
+    materials = {}
+    for w, a in zip(weights, area_sets):
+        for material, area in a.materials.items():
+            materials[material] = materials.get(material, 0.0) + w * area
+    return cut, fill, materials
+
+def average_end_volume(a1, a2):
+    """Volumes between two SectionAreas by the average-end-area method."""
+    length = a2.station - a1.station
+    return VolumeRow(a1.station, a2.station, *_combine((length / 2, length / 2), (a1, a2)))
+
+def prismoidal_volume(a1, a2, a3):
+    """Volumes across three SectionAreas (two intervals) by the prismoidal formula."""
+    h1 = a2.station - a1.station
+    h2 = a3.station - a2.station
+    if h1 <= 0 or h2 <= 0:
+        raise ValueError(f"Stations must increase: {a1.station}, {a2.station}, {a3.station}")
+    k = (h1 + h2) / 6
+    weights = (k * (2 - h2 / h1), k * (h1 + h2) ** 2 / (h1 * h2), k * (2 - h1 / h2))
+    return VolumeRow(a1.station, a3.station, *_combine(weights, (a1, a2, a3)))
+
+def iter_volume_rows(areas, method=AVERAGE_END_AREA):
+    """
+    Turns a station-ordered stream of SectionAreas into VolumeRows,
+    holding at most three sections at a time. Mass ordinates are not
+    filled in here (see accumulate_mass).
+    """
+    window = []
+    step = 2 if method == PRISMOIDAL else 1
+    for area in areas:
+        window.append(area)
+        if len(window) == step + 1:
+            if method == PRISMOIDAL:
+                yield prismoidal_volume(*window)
+            else:
+                yield average_end_volume(*window)
+            window = [window[-1]]
+    if len(window) == 2:
+        yield average_end_volume(*window)
+
+def accumulate_mass(rows, start_mass=0.0):
+    """Fills in the running mass ordinate (cumulative cut minus fill) of each row."""
+    mass = start_mass
+    for row in rows:
+        mass += row.cut - row.fill
+        row.mass = mass
+        yield row
+
+def _chunk_rows(job):
+    chunk, method = job
+    sections = (load_section(filepath, entry) for station, filepath, entry in chunk)
+    return list(iter_volume_rows((section_areas(s) for s in sections), method))
+
+def corridor_volumes(index, method=AVERAGE_END_AREA, jobs=None, chunk_intervals=512):
+    """
+    Yields the VolumeRows of a corridor given its index (see
+    road_container.corridor_index), in station order with mass ordinates.
+
+    The index is cut into chunks of chunk_intervals intervals that share
+    their boundary section. The chunk length is kept even so prismoidal
+    pairs line up exactly as in a single serial pass.
+    """
+    chunk_intervals += chunk_intervals % 2
+    chunks = [(index[start:start + chunk_intervals + 1], method)
+              for start in range(0, max(len(index) - 1, 0), chunk_intervals)]
+
+    if jobs == 1 or len(chunks) <= 1:
+        row_lists = map(_chunk_rows, chunks)
+        yield from accumulate_mass(row for rows in row_lists for row in rows)
+        return
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        row_lists = pool.map(_chunk_rows, chunks)
+        yield from accumulate_mass(row for rows in row_lists for row in rows)
+
+def write_volume_table(rows, out, materials=()):
+    """Writes VolumeRows as CSV, one column per listed material."""
+    writer = csv.writer(out)
+    writer.writerow(["start_station", "end_station", "cut", "fill", "mass"] + list(materials))
+    for row in rows:
+        writer.writerow([f"{row.start_station:.3f}", f"{row.end_station:.3f}", f"{row.cut:.3f}",
+                         f"{row.fill:.3f}", f"{row.mass:.3f}"]
+                        + [f"{row.materials.get(m, 0.0):.3f}" for m in materials])
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Corridor cut/fill volumes and mass-haul table.")
+    parser.add_argument("paths", nargs="+", help=".road/.roads files or directories")
+    parser.add_argument("--method", choices=(AVERAGE_END_AREA, PRISMOIDAL), default=AVERAGE_END_AREA)
+    parser.add_argument("--materials", default="", help="comma-separated layer types to tabulate")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="worker processes (default: one per core)")
+    parser.add_argument("-o", "--output", default=None, help="CSV file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    index = corridor_index(collect_road_files(args.paths))
+    if len(index) < 2:
+        print("Need at least two sections with a numeric chainage.", file=sys.stderr)
+        return 1
+
+    # Two sections at one station leave an interval of no length between them
+    for previous, item in zip(index, index[1:]):
+        if previous[0] == item[0]:
+            print(f"Error: {previous[1]} and {item[1]} both have a section at station {item[0]:g}",
+                  file=sys.stderr)
+            return 1
+
+    materials = [m for m in args.materials.split(",") if m]
+    rows = corridor_volumes(index, args.method, args.jobs)
+    try:
+        if args.output:
+            with open(args.output, 'w', newline='') as out:
+                write_volume_table(rows, out, materials)
+        else:
+            write_volume_table(rows, sys.stdout, materials)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
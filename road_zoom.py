@@ -0,0 +1,123 @@
+"""
+Mouse-wheel zoom and drag pan for the section canvas.
+
+While the user is zooming or dragging, nothing is redrawn: the layer
+polygons and axes already on the canvas are transformed in place with
+canvas.scale() / canvas.move(), which Tk does natively for every item
+with a tag in one call. Text does not scale, so the dimension labels
+are hidden meanwhile. Once the wheel or mouse has been still for
+SETTLE_MS, the section is drawn once more through the new Viewport,
+which lays the labels out again at their proper places.
+
+The view also follows the size of the canvas, so culling and clipping
+(see road_drawing.Viewport) cover the whole window when it is enlarged.
+"""
+from road_drawing import AXES_TAG, LABEL_TAG, LAYER_TAG, Viewport
+
+ZOOM_STEP = 1.2
+MIN_SCALE = 0.5
+MAX_SCALE = 400.0
+SETTLE_MS = 200
+
+
+class ZoomPan:
+    """
+    Binds zoom and pan to a canvas. on_settle(view) is called after an
+    interaction has finished, to draw the section properly through view.
+    """
+
+    def __init__(self, canvas, on_settle, view=None):
+        self.canvas = canvas
+        self.on_settle = on_settle
+        self.view = view if view is not None else Viewport()
+        self.drag_from = None
+        self.pending = None  # after() id of the settle redraw
+        self.labels_hidden = False
+
+        canvas.bind("<MouseWheel>", self._on_wheel)          # Windows / macOS
+        canvas.bind("<Button-4>", lambda e: self.zoom(e.x, e.y, ZOOM_STEP))   # X11
+        canvas.bind("<Button-5>", lambda e: self.zoom(e.x, e.y, 1 / ZOOM_STEP))
+        canvas.bind("<ButtonPress-1>", self._on_press)
+        canvas.bind("<B1-Motion>", self._on_drag)
+        canvas.bind("<ButtonRelease-1>", self._on_release)
+        canvas.bind("<Double-Button-1>", lambda e: self.reset())
+        canvas.bind("<Configure>", self._on_configure)
+
+    def zoom(self, x, y, factor):
+        """Zooms by factor about canvas point (x, y)."""
+        new_scale = min(max(self.view.scale * factor, MIN_SCALE), MAX_SCALE)
+        factor = new_scale / self.view.scale
+        if factor == 1.0:
+            return
+        self.view.zoom_at(x, y, factor)
+        self._begin_interaction()
+        for tag in (LAYER_TAG, AXES_TAG):
+            self.canvas.scale(tag, x, y, factor, factor)
+        self._schedule_settle()
+
+    def pan(self, dx, dy):
+        """Shifts the drawing by (dx, dy) pixels."""
+        if not dx and not dy:
+            return
+        self.view.pan(dx, dy)
+        self._begin_interaction()
+        for tag in (LAYER_TAG, AXES_TAG):
+            self.canvas.move(tag, dx, dy)
+        self._schedule_settle()
+
+    def reset(self):
+        """Goes back to the default view, keeping the canvas size."""
+        self.view = Viewport(width=self.view.width, height=self.view.height)
+        self._settle()
+
+    def resize(self, width, height):
+        """Makes the view cover a canvas of width x height pixels and redraws once it settles."""
+        if (width, height) == (self.view.width, self.view.height):
+            return
+        self.view.width = width
+        self.view.height = height
+        self._schedule_settle()
+
+    def _on_configure(self, event):
+        # The event's size includes the border and focus highlight around the drawing area
+        inset = 2 * (int(self.canvas.cget("borderwidth")) + int(self.canvas.cget("highlightthickness")))
+        self.resize(event.width - inset, event.height - inset)
+
+    def _on_wheel(self, event):
+        self.zoom(event.x, event.y, ZOOM_STEP if event.delta > 0 else 1 / ZOOM_STEP)
+
+    def _on_press(self, event):
+        self.drag_from = (event.x, event.y)
+
+    def _on_drag(self, event):
+        if self.drag_from is None:
+            return
+        x0, y0 = self.drag_from
+        self.drag_from = (event.x, event.y)
+        self.pan(event.x - x0, event.y - y0)
+
+    def _on_release(self, event):
+        self.drag_from = None
+
+    def _begin_interaction(self):
+        if not self.labels_hidden:
+            self.canvas.itemconfigure(LABEL_TAG, state="hidden")
+            self.labels_hidden = True
+
+    def _schedule_settle(self):
+        if self.pending is not None:
+            self.canvas.after_cancel(self.pending)
+        self.pending = self.canvas.after(SETTLE_MS, self._settle)
+
+    def _settle(self):
+        if self.pending is not None:
+            self.canvas.after_cancel(self.pending)
+            self.pending = None
+        if self.drag_from is not None:
+            # Still held down; wait for the next pause
+            self._schedule_settle()
+            return
+        self.on_settle(self.view)
+        if self.labels_hidden:
+            self.canvas.itemconfigure(LABEL_TAG, state="normal")
+            self.labels_hidden = False